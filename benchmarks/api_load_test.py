@@ -0,0 +1,110 @@
+"""
+Load test of a running API, concurrent clients hit the event and user endpoints for a fixed time.
+
+    make api
+    uv run python -m benchmarks.api_load_test --clients 50 --seconds 20 --username me --password secret
+
+Cached event responses hide the database, start the API with RESPONSE_CACHE_MAX_ENTRIES=0 to measure every
+request as a cache miss.
+"""
+
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+from collections import defaultdict
+
+import httpx
+
+EVENT_PATHS = [
+    "/events/?limit=50",
+    "/events/?skip=100&limit=50",
+    "/search_events/?from_date=2024-01-01T00:00:00&limit=50",
+    "/search_events/?from_date=2024-01-01T00:00:00&venue_keyword=the&limit=50",
+    "/search_events/?q=live music&limit=50",
+]
+USER_PATHS = ["/users/me/"]
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> dict:
+    response = await client.post("/token", data={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def run_client(
+    client: httpx.AsyncClient,
+    paths: itertools.cycle,
+    headers: dict,
+    deadline: float,
+    latencies: dict,
+    errors: dict,
+):
+    while time.perf_counter() < deadline:
+        path = next(paths)
+        started = time.perf_counter()
+        try:
+            response = await client.get(path, headers=headers)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            failed = True
+        endpoint = path.split("?")[0]
+        if failed:
+            errors[endpoint] += 1
+        else:
+            latencies[endpoint].append(time.perf_counter() - started)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    return statistics.quantiles(values, n=100)[int(fraction * 100) - 1] if len(values) > 1 else values[0]
+
+
+async def load_test(base_url: str, clients: int, seconds: float, username: str | None, password: str | None) -> dict:
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        headers = {}
+        paths = list(EVENT_PATHS)
+        if username is not None:
+            headers = await login(client, username, password)
+            paths += USER_PATHS
+
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(
+            *(
+                # Each client starts at a different path so the mix stays even.
+                run_client(
+                    client,
+                    itertools.islice(itertools.cycle(paths), index, None),
+                    headers,
+                    deadline,
+                    latencies,
+                    errors,
+                )
+                for index in range(clients)
+            )
+        )
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{'endpoint':<20}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}")
+    for endpoint in sorted(set(latencies) | set(errors)):
+        values = latencies[endpoint] or [0.0]
+        print(
+            f"{endpoint:<20}{len(latencies[endpoint]):>10}{errors[endpoint]:>8}"
+            f"{percentile(values, 0.5) * 1000:>10.1f}{percentile(values, 0.95) * 1000:>10.1f}"
+        )
+    print(f"{total / seconds:.1f} requests/sec with {clients} clients, {sum(errors.values())} errors")
+    return {"requests_per_second": total / seconds, "errors": sum(errors.values())}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base url of the API under test")
+    parser.add_argument("-c", "--clients", type=int, default=50, help="Concurrent clients")
+    parser.add_argument("-d", "--seconds", type=float, default=20, help="Duration of the test")
+    parser.add_argument("--username", help="Also load authenticated endpoints, logging in as this user")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+    asyncio.run(load_test(args.url, args.clients, args.seconds, args.username, args.password))
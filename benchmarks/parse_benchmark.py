@@ -0,0 +1,55 @@
+"""
+Parse time and peak memory per page for each BeautifulSoup backend, over the saved fixture pages.
+Compares parsing the full document with the per-source strainers the scrapers use.
+
+    uv run python -m benchmarks.parse_benchmark --rounds 50
+"""
+
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.web_scrapping.web_scraper import DO512_LISTING, HEYAUSTIN_DETAILS, HEYAUSTIN_LISTING, parse_page
+
+FIXTURES = Path(__file__).parent / "fixtures"
+PARSERS = ["html.parser", "lxml"]
+PAGE_STRAINERS = {
+    "do512_listing": DO512_LISTING,
+    "heyaustin_listing": HEYAUSTIN_LISTING,
+    "heyaustin_detail": HEYAUSTIN_DETAILS,
+}
+
+
+def measure(html: str, parser: str, strainer, rounds: int) -> tuple[float, float]:
+    """Mean parse time in milliseconds and peak traced memory in KiB of a single parse."""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        parse_page(html, strainer, parser)
+    elapsed_ms = (time.perf_counter() - started) * 1000 / rounds
+
+    tracemalloc.start()
+    soup = parse_page(html, strainer, parser)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del soup
+    return elapsed_ms, peak / 1024
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("-r", "--rounds", type=int, default=20, help="Parses per page and backend")
+    args = arg_parser.parse_args()
+
+    print(f"{'page':<28}{'parser':<13}{'mode':<10}{'ms/page':>10}{'peak KiB':>12}")
+    for page_type, strainer in PAGE_STRAINERS.items():
+        for fixture in sorted(FIXTURES.glob(f"{page_type}_*.html")):
+            html = fixture.read_text()
+            for parser in PARSERS:
+                for mode, mode_strainer in [("full", None), ("strained", strainer)]:
+                    elapsed_ms, peak_kib = measure(html, parser, mode_strainer, args.rounds)
+                    print(f"{fixture.stem:<28}{parser:<13}{mode:<10}{elapsed_ms:>10.2f}{peak_kib:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
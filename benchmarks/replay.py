@@ -0,0 +1,90 @@
+"""Stand-ins for the live sources: a local http server replaying fixtures and a stub Playwright page."""
+
+import threading
+from collections.abc import Callable
+from typing import Any
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from bs4 import BeautifulSoup
+
+# Gets the request path, query params and the server base url, returns the body and content type or None for a 404.
+Resolver = Callable[[str, dict, str], tuple[str, str] | None]
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        replay = self.server.replay
+        request = urlsplit(self.path)
+        resolved = replay.resolve(request.path, parse_qs(request.query), replay.base_url)
+        if resolved is None:
+            self.send_error(404)
+            return
+        body, content_type = resolved
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        replay.count_request()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer:
+    """Serves recorded fixtures on localhost, counting the pages served."""
+
+    def __init__(self, resolve: Resolver):
+        self.resolve = resolve
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), ReplayHandler)
+        self.httpd.replay = self
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def count_request(self):
+        with self._lock:
+            self.requests_served += 1
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class StubElement:
+    """Playwright ElementHandle returned by wait_for_selector, the CultureMap scraper only waits for it."""
+
+    def __init__(self, tag):
+        self.tag = tag
+
+
+class StubPage(StubElement):
+    """
+    Playwright page replaying a recorded document, the page is already fully loaded and scrolled.
+    Scripts passed to evaluate are answered by the python stand-ins registered for them in scripts.
+    """
+
+    def __init__(self, html: str, scripts: dict[str, Callable[[BeautifulSoup], Any]] | None = None):
+        super().__init__(BeautifulSoup(html, features="lxml"))
+        self.scripts = scripts or {}
+
+    def goto(self, url: str):
+        pass
+
+    def wait_for_selector(self, selector: str, timeout: float | None = None) -> StubElement:
+        tag = self.tag.select_one(selector)
+        if tag is None:
+            raise TimeoutError(f"{selector} not found in the replayed page")
+        return StubElement(tag)
+
+    def evaluate(self, expression: str, arg=None):
+        if expression in self.scripts:
+            return self.scripts[expression](self.tag)
+        # Scrolling scripts only read the page height, a constant one ends them right away.
+        return 0
@@ -0,0 +1,219 @@
+"""
+Offline throughput benchmark of every scraper source, replaying the recorded fixtures.
+Each source runs in its own process against a local stand-in server, so peak RSS is per source.
+
+    uv run python -m benchmarks.scraper_benchmark --save bench.json
+    uv run python -m benchmarks.scraper_benchmark --baseline bench.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import zlib
+from pathlib import Path
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SOURCES = ["do512", "heyaustin", "culturemap", "predict"]
+
+# Scrapers import settings from the environment, the benchmark never reaches a database or a live site.
+BENCHMARK_ENVIRONMENT = {
+    "DATABASE_URL": "sqlite://",
+    "SECRET_KEY": "benchmark",
+    "PREDICT_API": "http://127.0.0.1:9/",
+    "EVENTS_HQ_TOKEN": "benchmark",
+    "SCRAPER_HTTP_CACHE_DIR": "",
+    "SCRAPER_REQUESTS_PER_SECOND": "0",
+}
+
+
+def fixture(name: str) -> str:
+    return (FIXTURES / name).read_text()
+
+
+def resolve_do512(path: str, query: dict, base_url: str) -> tuple[str, str] | None:
+    pages = {"/events/today": "do512_listing_1.html", "/events/today/p/2": "do512_listing_2.html"}
+    return (fixture(pages[path]), "text/html") if path in pages else None
+
+
+def resolve_heyaustin(path: str, query: dict, base_url: str) -> tuple[str, str] | None:
+    pages = {"/austin-events/": "heyaustin_listing_1.html", "/austin-events/page/2/": "heyaustin_listing_2.html"}
+    if path in pages:
+        name = pages[path]
+    elif path.startswith("/events/"):
+        details = sorted(FIXTURES.glob("heyaustin_detail_*.html"))
+        name = details[zlib.crc32(path.encode()) % len(details)].name
+    else:
+        return None
+    return fixture(name).replace("https://heyaustin.com", base_url), "text/html"
+
+
+def resolve_predict(path: str, query: dict, base_url: str) -> tuple[str, str] | None:
+    recorded = json.loads(fixture("predict_events.json"))
+    offset = int(query.get("offset", ["0"])[0])
+    limit = int(query.get("limit", ["10"])[0])
+    page = {"count": recorded["count"], "results": recorded["results"][offset : offset + limit]}
+    return json.dumps(page), "application/json"
+
+
+def scrape(name: str) -> tuple[int, int, float, float | None]:
+    """
+    Scrape one source from its replay server.
+    Returns the events and pages scraped, the seconds spent scraping and the culturemap parse seconds.
+    """
+    from benchmarks.replay import ReplayServer, StubPage
+    from src.web_scrapping import events_api, web_scraper
+
+    if name == "culturemap":
+        page = StubPage(
+            fixture("culturemap_events.html"),
+            {web_scraper.CULTUREMAP_EVENTS_SCRIPT: culturemap_events_payload},
+        )
+        started = time.perf_counter()
+        events = web_scraper.parse_atx_culture_page(page)
+        elapsed = time.perf_counter() - started
+        return len(events), 1, elapsed, elapsed
+
+    resolvers = {"do512": resolve_do512, "heyaustin": resolve_heyaustin, "predict": resolve_predict}
+    with ReplayServer(resolvers[name]) as server:
+        started = time.perf_counter()
+        match name:
+            case "do512":
+                events = list(web_scraper.iter_events_data_source_do512(server.base_url + "/events/today"))
+            case "heyaustin":
+                events = list(web_scraper.iter_events_data_source_heyaustin(server.base_url + "/austin-events/"))
+            case "predict":
+                events_api.base_url = server.base_url + "/v1/events/"
+                events = list(events_api.get_predict_api_events())
+        elapsed = time.perf_counter() - started
+    return len(events), server.requests_served, elapsed, None
+
+
+def culturemap_events_payload(soup) -> dict:
+    """What CULTUREMAP_EVENTS_SCRIPT returns in the browser, read from the recorded page."""
+
+    def inner_text(tag) -> str:
+        return tag.get_text("\n", strip=True)
+
+    return {
+        "dates": [inner_text(date) for date in soup.select("div.module-headline__text")],
+        "grids": [
+            {
+                "links": [link.get("href") for link in grid.select("a")],
+                "posts": [inner_text(post) for post in grid.select("div.event-post")],
+            }
+            for grid in soup.select("div.grid-flow-row-dense")
+        ],
+    }
+
+
+def run_source(name: str, rounds: int, results: multiprocessing.Queue):
+    """Benchmark one source and report its numbers, runs in a child process."""
+    os.environ.update(BENCHMARK_ENVIRONMENT)
+    from src.web_scrapping import web_scraper
+
+    parse_seconds = 0.0
+    parse_page = web_scraper.parse_page
+
+    def timed_parse_page(*args, **kwargs):
+        nonlocal parse_seconds
+        started = time.perf_counter()
+        soup = parse_page(*args, **kwargs)
+        parse_seconds += time.perf_counter() - started
+        return soup
+
+    web_scraper.parse_page = timed_parse_page
+
+    # Warm up run, keeps imports and first connections out of the numbers.
+    scrape(name)
+    parse_seconds = 0.0
+
+    elapsed = 0.0
+    pages = 0
+    total_events = 0
+    for _ in range(rounds):
+        events, pages_served, seconds, culturemap_parse_seconds = scrape(name)
+        elapsed += seconds
+        pages += pages_served
+        total_events += events
+        if culturemap_parse_seconds is not None:
+            parse_seconds += culturemap_parse_seconds
+
+    results.put(
+        {
+            "source": name,
+            "seconds": elapsed / rounds,
+            "pages": pages // rounds,
+            "events": total_events // rounds,
+            "pages_per_second": pages / elapsed,
+            "events_per_second": total_events / elapsed,
+            "parse_ms_per_page": parse_seconds * 1000 / pages if parse_seconds else None,
+            # ru_maxrss is reported in KiB on Linux
+            "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+    )
+
+
+def run_benchmark(sources: list[str], rounds: int) -> list[dict]:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    report = []
+    for name in sources:
+        process = context.Process(target=run_source, args=(name, rounds, results))
+        process.start()
+        report.append(results.get())
+        process.join()
+    return report
+
+
+def print_report(report: list[dict]):
+    print(
+        f"{'source':<12}{'pages':>7}{'events':>8}{'pages/s':>10}{'events/s':>10}{'parse ms/page':>15}{'peak MiB':>10}"
+    )
+    for row in report:
+        parse_ms = f"{row['parse_ms_per_page']:.2f}" if row["parse_ms_per_page"] is not None else "-"
+        print(
+            f"{row['source']:<12}{row['pages']:>7}{row['events']:>8}{row['pages_per_second']:>10.1f}"
+            f"{row['events_per_second']:>10.1f}{parse_ms:>15}{row['peak_rss_mib']:>10.1f}"
+        )
+
+
+def regressions(report: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Sources whose events/sec dropped more than tolerance below the baseline run."""
+    previous = {row["source"]: row for row in baseline}
+    slower = []
+    for row in report:
+        before = previous.get(row["source"])
+        if before is not None and row["events_per_second"] < before["events_per_second"] * (1 - tolerance):
+            slower.append(
+                f"{row['source']}: {row['events_per_second']:.1f} events/s, baseline {before['events_per_second']:.1f}"
+            )
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-s", "--source", choices=SOURCES, action="append", help="Only run these sources")
+    parser.add_argument("-r", "--rounds", type=int, default=5, help="Measured scrapes per source")
+    parser.add_argument("--save", help="Write the results to this json file")
+    parser.add_argument("--baseline", help="Results file of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed events/sec drop against the baseline")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.source or SOURCES, args.rounds)
+    print_report(report)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, indent=2))
+    if args.baseline:
+        slower = regressions(report, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if slower:
+            print("Throughput regressions:", *slower, sep="\n  ")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,145 @@
 import argparse
-from src.constants import SOURCE_ONE, SOURCE_THREE, SOURCE_TWO
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import batched
+
+from src.constants import INGEST_CHUNK_SIZE, SOURCE_ONE, SOURCE_THREE, SOURCE_TWO
 from src.data.db_helper import add_events_to_db
+from src.data.scrape_state import IncrementalScrape
+from src.web_scrapping.events_api import iter_predict_api_events
 from src.web_scrapping.web_scraper import (
     gather_events_data_atx_culture,
-    gather_events_data_source_do512,
-    gather_events_data_source_heyaustin,
+    iter_events_data_source_do512,
+    iter_events_data_source_heyaustin,
 )
 
+PAGINATED_SOURCES = ("source1", "source2")
+
+
+def build_sources(incremental: bool = True) -> tuple[dict, dict]:
+    """
+    Scrapers of every source, Predict API included, with the scrape trackers of the paginated ones.
+    :param incremental: skip pages already seen, False reads every page but still records them.
+    """
+    trackers = {name: IncrementalScrape(name, skip_seen=incremental) for name in PAGINATED_SOURCES}
+    sources = {
+        "source1": lambda: iter_events_data_source_do512(SOURCE_ONE, tracker=trackers["source1"]),
+        "source2": lambda: iter_events_data_source_heyaustin(SOURCE_TWO, tracker=trackers["source2"]),
+        "source3": lambda: gather_events_data_atx_culture(SOURCE_THREE),
+        "predict": iter_predict_api_events,
+    }
+    return sources, trackers
+
 
-def handler_function():
-    add_events_to_db(gather_events_data_source_do512(SOURCE_ONE))
-    add_events_to_db(gather_events_data_source_heyaustin(SOURCE_TWO))
-    add_events_to_db(gather_events_data_atx_culture(SOURCE_THREE))
+def handler_function(incremental: bool = True):
+    sources, trackers = build_sources(incremental)
+    for name in ("source1", "source2", "source3"):
+        add_events_to_db(sources[name]())
+        if name in trackers:
+            trackers[name].save()
     print("All events scraped")
 
 
+def scrape_source(name: str, scraper, ingest_queue: queue.Queue, summary: dict):
+    """Run one scraper, handing its events to the writer in chunks as they are scraped."""
+    started = time.perf_counter()
+    try:
+        for chunk in batched(scraper(), INGEST_CHUNK_SIZE):
+            summary[name]["scraped"] += len(chunk)
+            ingest_queue.put((name, chunk))
+    except Exception as error:
+        summary[name]["error"] = repr(error)
+    summary[name]["seconds"] = time.perf_counter() - started
+
+
+def write_events(ingest_queue: queue.Queue, summary: dict):
+    """
+    Single database writer for every source, runs until it receives None.
+    A chunk that fails to ingest is recorded as an error of its source, the writer keeps draining the queue
+    so the scrapers putting into it never block.
+    """
+    while (item := ingest_queue.get()) is not None:
+        name, chunk = item
+        try:
+            added, updated, unchanged = add_events_to_db(chunk)
+        except Exception as error:
+            summary[name]["error"] = summary[name]["error"] or repr(error)
+            continue
+        summary[name]["added"] += added
+        summary[name]["updated"] += updated
+        summary[name]["unchanged"] += unchanged
+
+
+def run_sources_in_parallel(incremental: bool = True) -> dict:
+    """
+    Scrape every source at the same time, total time is the slowest source instead of the sum of them.
+    Returns the timing and row counts of each source.
+    :param incremental: skip pages already seen.
+    """
+    sources, trackers = build_sources(incremental)
+    summary = {
+        name: {"seconds": 0.0, "scraped": 0, "added": 0, "updated": 0, "unchanged": 0, "error": None}
+        for name in sources
+    }
+    # Bounded so fast sources wait for the writer instead of piling events up in memory.
+    ingest_queue = queue.Queue(maxsize=len(sources) * 2)
+    writer = threading.Thread(target=write_events, args=(ingest_queue, summary))
+    writer.start()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+        for name, scraper in sources.items():
+            executor.submit(scrape_source, name, scraper, ingest_queue, summary)
+    ingest_queue.put(None)
+    writer.join()
+    for name, tracker in trackers.items():
+        # A failed run may have stopped before pages it would otherwise record, or recorded pages whose events
+        # never made it to the database.
+        if summary[name]["error"] is None:
+            tracker.save()
+
+    print(f"{'source':<10}{'seconds':>10}{'scraped':>10}{'added':>10}{'updated':>10}{'unchanged':>10}")
+    for name, stats in summary.items():
+        print(
+            f"{name:<10}{stats['seconds']:>10.1f}{stats['scraped']:>10}{stats['added']:>10}"
+            f"{stats['updated']:>10}{stats['unchanged']:>10}"
+            + (f"  failed: {stats['error']}" if stats["error"] else "")
+        )
+    print(f"All events scraped in {time.perf_counter() - started:.1f} seconds")
+    return summary
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("-s", "--source", help="Enter source: source1, source2, source3, all")
+    parser.add_argument(
+        "-p", "--parallel", action="store_true", help="Scrape all sources, Predict API included, at the same time"
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--incremental",
+        dest="incremental",
+        action="store_true",
+        default=True,
+        help="Skip pages unchanged or already stored since the last run (default)",
+    )
+    mode.add_argument(
+        "--full", dest="incremental", action="store_false", help="Read every page, e.g. for a weekly reconciliation"
+    )
     args = parser.parse_args()
 
+    if args.parallel:
+        run_sources_in_parallel(args.incremental)
+        raise SystemExit
+
     match args.source:
-        case "source1":
-            data = gather_events_data_source_do512(SOURCE_ONE)
-            add_events_to_db(data)
-        case "source2":
-            data = gather_events_data_source_heyaustin(SOURCE_TWO)
-            add_events_to_db(data)
-        case "source3":
-            data = gather_events_data_atx_culture(SOURCE_THREE)
-            add_events_to_db(data)
+        case "source1" | "source2" | "source3":
+            sources, trackers = build_sources(args.incremental)
+            add_events_to_db(sources[args.source]())
+            if args.source in trackers:
+                trackers[args.source].save()
         case _:
             print("No source provided, run all")
-            for func, source in [
-                (gather_events_data_source_do512, SOURCE_ONE),
-                (gather_events_data_source_heyaustin, SOURCE_TWO),
-                (gather_events_data_atx_culture, SOURCE_THREE),
-            ]:
-                data = func(source)
-                add_events_to_db(data)
-
+            handler_function(args.incremental)
@@ -22,7 +22,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
-    op.drop_table("userindb")
+    # userindb was only ever made by create_all, databases built from these migrations never had it.
+    op.execute("DROP TABLE IF EXISTS userindb")
     # ### end Alembic commands ###
 
 
@@ -0,0 +1,50 @@
+"""event search indexes
+
+Revision ID: c4e9a1f3b6d2
+Revises: 8b1d4c2e7a90
+Create Date: 2026-10-18 11:03:27.904615
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e9a1f3b6d2"
+down_revision: Union[str, None] = "8b1d4c2e7a90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves the start_datetime range filters and the (start_datetime, id) keyset pagination.
+    op.create_index("ix_event_start_datetime_id", "event", ["start_datetime", "id"], unique=False)
+
+    # Trigram indexes let ILIKE '%keyword%' searches use an index, only available on Postgres.
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_event_venue_trgm",
+            "event",
+            ["venue"],
+            postgresql_using="gin",
+            postgresql_ops={"venue": "gin_trgm_ops"},
+        )
+        op.create_index(
+            "ix_event_category_trgm",
+            "event",
+            ["category"],
+            postgresql_using="gin",
+            postgresql_ops={"category": "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_event_category_trgm", table_name="event")
+        op.drop_index("ix_event_venue_trgm", table_name="event")
+    op.drop_index("ix_event_start_datetime_id", table_name="event")
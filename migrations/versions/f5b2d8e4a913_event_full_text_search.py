@@ -0,0 +1,82 @@
+"""event full text search
+
+Revision ID: f5b2d8e4a913
+Revises: e3a9c7d1f486
+Create Date: 2026-10-18 16:42:13.508214
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f5b2d8e4a913"
+down_revision: Union[str, None] = "e3a9c7d1f486"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    match op.get_bind().dialect.name:
+        case "postgresql":
+            # The simple configuration keeps stop words and doesn't stem, artist names like "The Who" stay searchable.
+            # Title matches rank above venue ones, which rank above category ones.
+            op.execute(
+                """
+                ALTER TABLE event ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+                    setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+                    || setweight(to_tsvector('simple', coalesce(venue, '')), 'B')
+                    || setweight(to_tsvector('simple', coalesce(category, '')), 'C')
+                ) STORED
+                """
+            )
+            op.create_index("ix_event_search_vector", "event", ["search_vector"], postgresql_using="gin")
+        case "sqlite":
+            # Development databases index the same columns in an FTS5 table kept in sync by triggers.
+            op.execute(
+                "CREATE VIRTUAL TABLE event_fts USING fts5(title, venue, category, content='event', content_rowid='id')"
+            )
+            op.execute("INSERT INTO event_fts(event_fts, rank) VALUES ('rank', 'bm25(10.0, 3.0, 1.0)')")
+            op.execute(
+                """
+                CREATE TRIGGER event_fts_insert AFTER INSERT ON event BEGIN
+                    INSERT INTO event_fts(rowid, title, venue, category)
+                    VALUES (new.id, new.title, new.venue, new.category);
+                END
+                """
+            )
+            op.execute(
+                """
+                CREATE TRIGGER event_fts_delete AFTER DELETE ON event BEGIN
+                    INSERT INTO event_fts(event_fts, rowid, title, venue, category)
+                    VALUES ('delete', old.id, old.title, old.venue, old.category);
+                END
+                """
+            )
+            op.execute(
+                """
+                CREATE TRIGGER event_fts_update AFTER UPDATE ON event BEGIN
+                    INSERT INTO event_fts(event_fts, rowid, title, venue, category)
+                    VALUES ('delete', old.id, old.title, old.venue, old.category);
+                    INSERT INTO event_fts(rowid, title, venue, category)
+                    VALUES (new.id, new.title, new.venue, new.category);
+                END
+                """
+            )
+            op.execute("INSERT INTO event_fts(event_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    match op.get_bind().dialect.name:
+        case "postgresql":
+            op.drop_index("ix_event_search_vector", table_name="event", postgresql_using="gin")
+            op.drop_column("event", "search_vector")
+        case "sqlite":
+            op.execute("DROP TRIGGER event_fts_update")
+            op.execute("DROP TRIGGER event_fts_delete")
+            op.execute("DROP TRIGGER event_fts_insert")
+            op.execute("DROP TABLE event_fts")
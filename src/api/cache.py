@@ -0,0 +1,104 @@
+import gzip
+import hashlib
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import brotli
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.constants import CACHE_GENERATION_CHECK_SECONDS, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL
+from src.data.db_helper import EVENTS_GENERATION, bump_cache_generation, get_cache_generation
+from src.ttl_cache import TTLCache
+
+# Encodings cached responses can be sent with, in order of preference.
+COMPRESSIONS = {
+    "br": lambda body: brotli.compress(body, quality=5),
+    "gzip": lambda body: gzip.compress(body, compresslevel=6),
+}
+# Smaller bodies are sent as is, compressing them saves less than it costs.
+MIN_COMPRESSED_SIZE = 1000
+
+
+def preferred_encoding(accept_encoding: str) -> str | None:
+    """Best encoding of COMPRESSIONS the client accepts, None to send the body uncompressed."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, quality = part.partition(";q=")
+        try:
+            # q=0 means the client refuses that coding.
+            if float(quality or 1) > 0:
+                accepted.add(coding.strip())
+        except ValueError:
+            continue
+    return next((encoding for encoding in COMPRESSIONS if encoding in accepted), None)
+
+
+class EventsResponseCache:
+    """
+    Responses of the read-only event endpoints, keyed on the route and the validated arguments of its endpoint.
+    Keys include the events generation stored in the database so writes made by any worker,
+    or by the scrapers, invalidate every cached response.
+    """
+
+    def __init__(self, engine, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, ttl: float = RESPONSE_CACHE_TTL):
+        self.engine = engine
+        self.responses = TTLCache(max_entries, ttl)
+        self._generation = None
+        self._generation_checked_at = 0.0
+
+    async def generation(self) -> int:
+        if time.monotonic() - self._generation_checked_at > CACHE_GENERATION_CHECK_SECONDS:
+            async with AsyncSession(self.engine) as session:
+                generation = await session.run_sync(get_cache_generation, EVENTS_GENERATION)
+            if generation != self._generation:
+                self.responses.clear()
+            self._generation = generation
+            self._generation_checked_at = time.monotonic()
+        return self._generation
+
+    async def invalidate(self, session: AsyncSession):
+        """Commit the session's pending event changes along with a bumped generation, then drop local responses."""
+        await session.run_sync(bump_cache_generation, EVENTS_GENERATION)
+        await session.commit()
+        self.responses.clear()
+        self._generation_checked_at = 0.0
+
+    async def response(
+        self, request: Request, params: dict, build: Callable[[], Awaitable[tuple[Any, dict]]]
+    ) -> Response:
+        """
+        Cached JSON response for this request, build is awaited for the payload and extra headers on a miss.
+        Answers 304 when the client already holds the current version.
+        Bodies are compressed once per encoding and kept along with the response.
+        :param params: validated and normalized arguments the payload depends on, unknown query params or different
+        spellings of the same value share the entry instead of filling the cache.
+        """
+        key = (await self.generation(), request.scope["route"].path, tuple(params.items()))
+        cached = self.responses.get(key)
+        if cached is None:
+            payload, headers = await build()
+            body = orjson.dumps(payload, default=jsonable_encoder)
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            cached = (body, {**headers, "ETag": etag, "Vary": "Accept-Encoding"}, {})
+            self.responses.set(key, cached)
+
+        body, headers, compressed = cached
+        if_none_match = request.headers.get("if-none-match", "")
+        client_etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if headers["ETag"] in client_etags or "*" in client_etags:
+            return Response(status_code=304, headers=headers)
+
+        encoding = preferred_encoding(request.headers.get("accept-encoding", ""))
+        if encoding is None or len(body) < MIN_COMPRESSED_SIZE:
+            return Response(content=body, media_type="application/json", headers=headers)
+        if encoding not in compressed:
+            compressed[encoding] = COMPRESSIONS[encoding](body)
+        return Response(
+            content=compressed[encoding],
+            media_type="application/json",
+            headers={**headers, "Content-Encoding": encoding},
+        )
@@ -1,257 +1,569 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, status
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import delete, func, literal, union_all
+from sqlalchemy.exc import IntegrityError
 from src.data.db_helper import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     authenticate_user,
+    conflict_ignoring_insert,
     create_access_token,
+    event_content_hash,
+    get_async_session,
     get_current_active_user,
 )
-from src.constants import DATABASE_URL
+from src.constants import MAX_EVENTS_LIMIT, MAX_SEARCH_LIMIT
+from src.api.cache import EventsResponseCache
+from src.api.pagination import (
+    KEYSET_ORDER,
+    after_cursor,
+    after_rank_cursor,
+    decode_cursor,
+    decode_rank_cursor,
+    next_cursor,
+    next_rank_cursor,
+)
+from src.api.search import full_text_search
+from src.data.database import async_engine, pool_metrics
+
+from src.data.db_models import (
+    Event,
+    EventCreate,
+    EventIdsRequest,
+    EventRead,
+    EventUpdate,
+    User,
+    Token,
+    UserEventsAttended,
+    UserEventsSaved,
+    UserRead,
+)
+from src.data.db_helper import forget_user, password_hasher, user_cache
 
-from src.data.db_models import Event, User, Token, UserEventsAttended, UserEventsSaved
-from src.data.db_helper import get_password_hash
+app = FastAPI(default_response_class=ORJSONResponse)
+# Cached event responses come compressed already, the middleware leaves them alone.
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 
-app = FastAPI()
+events_cache = EventsResponseCache(async_engine)
 
-engine = create_engine(DATABASE_URL)
 
-SQLModel.metadata.create_all(engine)
+@app.post("/token", response_model=Token)
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_async_session)
+):
+    user = await authenticate_user(session, form_data.username, form_data.password)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(data={"sub": user.user_name}, expires_delta=access_token_expires)
+    return {"access_token": access_token, "token_type": "bearer"}
 
 
-@app.post("/token", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    with Session(engine) as session:
-        user = authenticate_user(session, form_data.username, form_data.password)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect username or password",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(data={"sub": user.user_name}, expires_delta=access_token_expires)
-        return {"access_token": access_token, "token_type": "bearer"}
-
-
-@app.get("/users/me/events/attended", response_model=User)
-def get_attended_events(current_user: User = Depends(get_current_active_user)):
-    with Session(engine) as session:
-        query = select(Event).where(UserEventsAttended.user_id == current_user.id)
-        events = session.exec(query).all
-        return events
+# Listings select these columns as plain rows, no Event entity is built or validated per row.
+EVENT_READ_COLUMNS = tuple(getattr(Event, name) for name in EventRead.model_fields)
+USER_READ_COLUMNS = tuple(getattr(User, name) for name in UserRead.model_fields)
 
 
-@app.get("/users/me/events/saved", response_model=User)
-def get_saved_events(current_user: User = Depends(get_current_active_user)):
-    with Session(engine) as session:
-        query = select(Event).where(UserEventsSaved.user_id == current_user.id)
-        events = session.exec(query).all
-        return events
+def as_event_read(row) -> dict:
+    """Fields of EventRead from a row selected with EVENT_READ_COLUMNS, ready to be serialized."""
+    return {name: getattr(row, name) for name in EventRead.model_fields}
+
+
+async def query_user_events(
+    session: AsyncSession,
+    link_model: type[UserEventsAttended] | type[UserEventsSaved],
+    user_id: int,
+    upcoming_only: bool,
+    limit: int,
+    cursor: str | None,
+) -> dict:
+    """
+    Page of events linked to a user, ordered by start date.
+    Joins through the link table so only the user's rows are read, its primary key starts with user_id.
+    """
+    statement = (
+        select(*EVENT_READ_COLUMNS)
+        .join(link_model, link_model.event_id == Event.id)
+        .where(link_model.user_id == user_id)
+    )
+    if upcoming_only:
+        statement = statement.where(Event.start_datetime >= datetime.now())
+    if cursor is not None:
+        statement = statement.where(after_cursor(cursor))
+    statement = statement.order_by(*KEYSET_ORDER).limit(limit)
+
+    rows = (await session.exec(statement)).all()
+    return {"events": [as_event_read(row) for row in rows], "next_cursor": next_cursor(rows, limit)}
+
+
+@app.get("/users/me/events/attended", response_model=dict)
+async def get_attended_events(
+    upcoming_only: bool = False,
+    limit: int = Query(default=MAX_EVENTS_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    cursor: str | None = None,
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+) -> dict:
+    """
+    Get a page of events the user attended, ordered by start date.
+    - **upcoming_only**: Only events that haven't started yet.
+    - **limit**: Maximum number of records to return.
+    - **cursor**: `next_cursor` of the previous page, returns the events that follow it.
+    """
+    return await query_user_events(session, UserEventsAttended, current_user.id, upcoming_only, limit, cursor)
+
+
+@app.get("/users/me/events/saved", response_model=dict)
+async def get_saved_events(
+    upcoming_only: bool = False,
+    limit: int = Query(default=MAX_EVENTS_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    cursor: str | None = None,
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+) -> dict:
+    """
+    Get a page of events the user saved, ordered by start date.
+    - **upcoming_only**: Only events that haven't started yet.
+    - **limit**: Maximum number of records to return.
+    - **cursor**: `next_cursor` of the previous page, returns the events that follow it.
+    """
+    return await query_user_events(session, UserEventsSaved, current_user.id, upcoming_only, limit, cursor)
 
 
 @app.post("/users/me/events/saved", response_model=UserEventsSaved)
-def save_event(save_event_request: dict, current_user: User = Depends(get_current_active_user)):
+async def save_event(
+    save_event_request: dict,
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
     event_id = save_event_request["event_id"]
-    with Session(engine) as session:
-        query = select(UserEventsSaved).where(
-            UserEventsSaved.user_id == current_user.id, UserEventsSaved.event_id == event_id
-        )
-        check_event_saved = session.exec(query).first()
-        if check_event_saved:
-            raise HTTPException(status_code=409, detail="Event is already saved for this user.")
-        else:
-            new_saved_event = UserEventsSaved(user_id=current_user.id, event_id=event_id)
-            session.add(new_saved_event)
-            session.commit()
-            session.refresh(new_saved_event)
-        return {"detail": "Event saved successfully!", "saved_event": new_saved_event}
+    query = select(UserEventsSaved).where(
+        UserEventsSaved.user_id == current_user.id, UserEventsSaved.event_id == event_id
+    )
+    check_event_saved = (await session.exec(query)).first()
+    if check_event_saved:
+        raise HTTPException(status_code=409, detail="Event is already saved for this user.")
+    else:
+        new_saved_event = UserEventsSaved(user_id=current_user.id, event_id=event_id)
+        session.add(new_saved_event)
+        await session.commit()
+        await session.refresh(new_saved_event)
+    return {"detail": "Event saved successfully!", "saved_event": new_saved_event}
 
 
 @app.delete("/users/me/events/saved", response_model=UserEventsSaved)
-def remove_saved_event(save_event_request: dict, current_user: User = Depends(get_current_active_user)):
+async def remove_saved_event(
+    save_event_request: dict,
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
     event_id = save_event_request["event_id"]
-    with Session(engine) as session:
-        query = select(UserEventsSaved).where(
-            UserEventsSaved.user_id == current_user.id, UserEventsSaved.event_id == event_id
+    query = select(UserEventsSaved).where(
+        UserEventsSaved.user_id == current_user.id, UserEventsSaved.event_id == event_id
+    )
+    check_event_saved = (await session.exec(query)).first()
+    if not check_event_saved:
+        raise HTTPException(status_code=404, detail="Event is not currently saved for this user.")
+    else:
+        await session.delete(check_event_saved)
+        await session.commit()
+    return check_event_saved
+
+
+@app.get("/metrics/db-pool", response_model=dict)
+async def database_pool_metrics() -> dict:
+    """Connection pool usage of this worker: connections checked out, overflow and checkout wait times."""
+    return pool_metrics(async_engine)
+
+
+@app.get("/metrics/password-hashing", response_model=dict)
+async def password_hashing_metrics() -> dict:
+    """bcrypt calls of this worker and how long they waited for a free hashing thread."""
+    return password_hasher.metrics()
+
+
+@app.get("/metrics/user-cache", response_model=dict)
+async def user_cache_metrics() -> dict:
+    """Hits and misses of this worker's authenticated user cache."""
+    return {"hits": user_cache.hits, "misses": user_cache.misses}
+
+
+@app.get("/users/me/events/saved/ids", response_model=dict)
+async def get_saved_event_ids(
+    current_user: User = Depends(get_current_active_user), session: AsyncSession = Depends(get_async_session)
+) -> dict:
+    """Ids of every event saved by the user, enough to render the save state of a page of events."""
+    query = select(UserEventsSaved.event_id).where(UserEventsSaved.user_id == current_user.id)
+    return {"event_ids": (await session.exec(query)).all()}
+
+
+@app.post("/users/me/events/saved/bulk", response_model=dict)
+async def save_events(
+    save_events_request: EventIdsRequest,
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+) -> dict:
+    """Save several events for the user in one transaction, events already saved or not found are skipped."""
+    event_ids = set(save_events_request.event_ids)
+    known_events = select(literal(current_user.id), Event.id).where(Event.id.in_(event_ids))
+    insert = conflict_ignoring_insert(session.bind.dialect.name)
+    if insert is not None:
+        statement = (
+            insert(UserEventsSaved)
+            .from_select(["user_id", "event_id"], known_events)
+            .on_conflict_do_nothing(index_elements=["user_id", "event_id"])
         )
-        check_event_saved = session.exec(query).first()
-        if not check_event_saved:
-            raise HTTPException(status_code=404, detail="Event is not currently saved for this user.")
-        else:
-            session.delete(check_event_saved)
-            session.commit()
-        return check_event_saved
-
-
-@app.get("/users/me/", response_model=User)
-def get_me(current_user: User = Depends(get_current_active_user)) -> User:
-    with Session(engine) as session:
-        user = session.query(User).filter(User.user_name == current_user.user_name).first()
-        if not user:
-            raise HTTPException(
-                status_code=404,
-                detail=f"User email {current_user.email} with username {current_user.user_name} not found",
-            )
-    return user
+        saved = (await session.execute(statement)).rowcount
+    else:
+        already_saved = select(UserEventsSaved.event_id).where(UserEventsSaved.user_id == current_user.id)
+        new_event_ids = (
+            await session.exec(select(Event.id).where(Event.id.in_(event_ids), Event.id.not_in(already_saved)))
+        ).all()
+        session.add_all(UserEventsSaved(user_id=current_user.id, event_id=event_id) for event_id in new_event_ids)
+        saved = len(new_event_ids)
+    await session.commit()
+    return {"detail": "Events saved successfully!", "saved": saved}
+
+
+@app.delete("/users/me/events/saved/bulk", response_model=dict)
+async def remove_saved_events(
+    remove_events_request: EventIdsRequest,
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+) -> dict:
+    """Remove several saved events of the user in one statement, events that weren't saved are skipped."""
+    statement = delete(UserEventsSaved).where(
+        UserEventsSaved.user_id == current_user.id,
+        UserEventsSaved.event_id.in_(set(remove_events_request.event_ids)),
+    )
+    removed = (await session.execute(statement)).rowcount
+    await session.commit()
+    return {"detail": "Events removed successfully!", "removed": removed}
+
+
+@app.get("/users/me/", response_model=UserRead)
+async def get_me(current_user: User = Depends(get_current_active_user)) -> User:
+    # get_current_user just loaded the user from the database, no need to query it again.
+    return current_user
 
 
 @app.get("/search_events/", response_model=dict)
-def search_events(
+async def search_events(
+    request: Request,
     from_date: datetime | None = None,
     to_date: datetime | None = None,
     venue_keyword: str | None = None,
     category_keyword: str | None = None,
-) -> list[Event]:
+    limit: int = Query(default=MAX_EVENTS_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    cursor: str | None = None,
+    include: str | None = None,
+    q: str | None = None,
+    session: AsyncSession = Depends(get_async_session),
+) -> dict:
     """
-    Get a list of events based on specified search.
+    Get a page of events based on specified search, ordered by start date.
     - **limit**: Maximum number of records to return.
+    - **cursor**: `next_cursor` of the previous page, returns the events that follow it.
     - **from_date**: Filter events starting on this date
     - **to_date**: Filter events till this date
     - **venue_keyword**: Search for events in the venue name.
+    - **q**: Full text search of the title, venue and category, events come ordered by relevance instead.
+    - **include**: Comma separated counts added to every event: attendee_count, saved_count.
     """
+    include_counts = parse_include(include)
+    # Both full text searches split the terms on whitespace.
+    q = " ".join(q.split()) if q else None
     if from_date and to_date and from_date > to_date:
         raise HTTPException(status_code=400, detail="from_date must be before to_date")
     if not from_date and to_date:
         raise HTTPException(status_code=400, detail="must provide a from_date if to_date is provided.")
 
-    with Session(engine) as session:
-        statement = select(Event)
-
-        # Build the query filters
-        filters = []
-        if from_date is not None:
-            filters.append(Event.start_datetime >= from_date)
-        if to_date is not None:
-            filters.append(Event.start_datetime <= to_date)
-        if venue_keyword is not None:
-            filters.append(Event.venue.ilike(f"%{venue_keyword}%"))
-        if category_keyword is not None:
-            filters.append(Event.category.ilike(f"%{category_keyword}%"))
-
-        # Apply filters to the statement if there are any
-        if filters:
-            statement = statement.where(*filters)
-
-        events = session.exec(statement).all()
-        count_statment = select(func.count(Event.id)).where(*filters)
-        total_events = session.exec(count_statment).one()
+    async def build():
+        page = await query_events(session, from_date, to_date, venue_keyword, category_keyword, limit, cursor, q)
+        page["events"] = await with_event_counts(session, page["events"], include_counts)
+        return page, {}
+
+    params = {
+        "from_date": from_date,
+        "to_date": to_date,
+        "venue_keyword": venue_keyword,
+        "category_keyword": category_keyword,
+        "limit": limit,
+        "cursor": None if cursor is None else decode_rank_cursor(cursor) if q else decode_cursor(cursor),
+        "include": tuple(include_counts),
+        "q": q,
+    }
+    return await events_cache.response(request, params, build)
+
+
+async def query_events(
+    session: AsyncSession,
+    from_date: datetime | None,
+    to_date: datetime | None,
+    venue_keyword: str | None,
+    category_keyword: str | None,
+    limit: int,
+    cursor: str | None,
+    q: str | None = None,
+) -> dict:
+    # Build the query filters
+    filters = []
+    search = full_text_search(session.bind.dialect.name, q) if q else None
+    if search is not None:
+        filters.append(search.condition)
+    if from_date is not None:
+        filters.append(Event.start_datetime >= from_date)
+    if to_date is not None:
+        filters.append(Event.start_datetime <= to_date)
+    if venue_keyword is not None:
+        filters.append(Event.venue.ilike(f"%{venue_keyword}%"))
+    if category_keyword is not None:
+        filters.append(Event.category.ilike(f"%{category_keyword}%"))
+
+    # The total of matching events comes back as an extra column of the page query, one round trip.
+    count_statment = select(func.count(Event.id)).where(*filters)
+    if search is not None and search.join_table is not None:
+        count_statment = count_statment.join(search.join_table, search.onclause)
+    statement = select(
+        *EVENT_READ_COLUMNS, count_statment.scalar_subquery().correlate(None).label("total_events")
+    ).where(*filters)
+    if search is not None:
+        if search.join_table is not None:
+            statement = statement.join(search.join_table, search.onclause)
+        statement = statement.add_columns(search.relevance.label("relevance"))
+        if cursor is not None:
+            statement = statement.where(after_rank_cursor(search.relevance, cursor))
+        statement = statement.order_by(search.relevance.desc(), Event.id).limit(limit)
+    else:
+        if cursor is not None:
+            statement = statement.where(after_cursor(cursor))
+        statement = statement.order_by(*KEYSET_ORDER).limit(limit)
+
+    rows = (await session.exec(statement)).all()
+    events = [as_event_read(row) for row in rows]
+    if rows:
+        total_events = rows[0].total_events
+    elif cursor is not None:
+        # A cursor past the last match returns no rows to read the total from.
+        total_events = (await session.exec(count_statment)).one()
+    else:
+        total_events = 0
+
+    following_cursor = next_rank_cursor(rows, limit) if search is not None else next_cursor(rows, limit)
+    return {"total_events": total_events, "events": events, "next_cursor": following_cursor}
+
+
+# Counts that can be added to listed events, with the link table each one counts rows of.
+EVENT_COUNTS = {"attendee_count": UserEventsAttended, "saved_count": UserEventsSaved}
+# Link tables between users and events, deleting either side deletes their rows first.
+LINK_MODELS = (UserEventsAttended, UserEventsSaved)
+
+
+def parse_include(include: str | None) -> list[str]:
+    """Counts requested through the include query param, 400 for names that aren't in EVENT_COUNTS."""
+    if include is None:
+        return []
+    names = [name.strip() for name in include.split(",") if name.strip()]
+    unknown = set(names) - EVENT_COUNTS.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include {', '.join(sorted(unknown))}, options are {', '.join(EVENT_COUNTS)}.",
+        )
+    # In the order of EVENT_COUNTS, the same counts requested in any order share a cached response.
+    return [name for name in EVENT_COUNTS if name in names]
 
-        return {"total_events": total_events, "events": events}
 
+async def with_event_counts(session: AsyncSession, events: list[dict], include: list[str]) -> list[dict]:
+    """
+    Events with the requested counts added, every count of the page comes from a single grouped aggregate.
+    Counts are cached along with the page, so they may lag behind by up to the response cache ttl.
+    """
+    if not include or not events:
+        return events
 
-@app.get("/events/", response_model=list[Event])
-def read_events(
-    skip: int = 0,
-    limit: int = 50,
-) -> list[Event]:
+    event_ids = [event["id"] for event in events]
+    per_count = [
+        select(link_model.event_id, literal(name).label("name"), func.count().label("total"))
+        .where(link_model.event_id.in_(event_ids))
+        .group_by(link_model.event_id)
+        for name, link_model in EVENT_COUNTS.items()
+        if name in include
+    ]
+    statement = per_count[0] if len(per_count) == 1 else union_all(*per_count)
+    counts = {(event_id, name): total for event_id, name, total in await session.execute(statement)}
+    return [{**event, **{name: counts.get((event["id"], name), 0) for name in include}} for event in events]
+
+
+@app.get("/events/", response_model=list[EventRead])
+async def read_events(
+    request: Request,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=MAX_EVENTS_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    cursor: str | None = None,
+    include: str | None = None,
+    session: AsyncSession = Depends(get_async_session),
+) -> list[EventRead]:
     """
-    Get all events.
+    Get all events, ordered by start date.
     - **limit**: Maximum number of records to return.
     - **skip**: Amount of events skipped, query will pull the next 50 if available
+    - **cursor**: Value of the `X-Next-Cursor` header of the previous page, used instead of skip
+    so deep pages don't have to scan every event before them.
+    - **include**: Comma separated counts added to every event: attendee_count, saved_count.
     """
-    with Session(engine) as session:
-        statement = select(Event).offset(skip).limit(limit)
-        events = session.exec(statement).all()
-        return events
+    include_counts = parse_include(include)
 
-
-@app.get("/events/{event_id}", response_model=Event)
-def read_event(event_id: int) -> Event:
-    with Session(engine) as session:
-        event = session.get(Event, event_id)
-        if not event:
+    async def build():
+        statement = select(*EVENT_READ_COLUMNS).order_by(*KEYSET_ORDER).limit(limit)
+        if cursor is not None:
+            statement = statement.where(after_cursor(cursor))
+        else:
+            statement = statement.offset(skip)
+        rows = (await session.exec(statement)).all()
+        following_cursor = next_cursor(rows, limit)
+        headers = {"X-Next-Cursor": following_cursor} if following_cursor is not None else {}
+        events = [as_event_read(row) for row in rows]
+        return await with_event_counts(session, events, include_counts), headers
+
+    params = {
+        "skip": None if cursor is not None else skip,
+        "limit": limit,
+        "cursor": None if cursor is None else decode_cursor(cursor),
+        "include": tuple(include_counts),
+    }
+    return await events_cache.response(request, params, build)
+
+
+@app.get("/events/{event_id}", response_model=EventRead)
+async def read_event(request: Request, event_id: int, session: AsyncSession = Depends(get_async_session)) -> EventRead:
+    async def build():
+        row = (await session.exec(select(*EVENT_READ_COLUMNS).where(Event.id == event_id))).first()
+        if not row:
             raise HTTPException(status_code=404, detail="Event not found")
-    return event
+        return as_event_read(row), {}
 
+    return await events_cache.response(request, {"event_id": event_id}, build)
 
-@app.post("/events/", response_model=Event)
-def create_event(event: Event) -> Event:
-    with Session(engine) as session:
-        session.add(event)
-        session.commit()
-        session.refresh(event)
+
+@app.post("/events/", response_model=EventRead)
+async def create_event(event_create: EventCreate, session: AsyncSession = Depends(get_async_session)) -> Event:
+    event = Event.model_validate(event_create)
+    event.content_hash = event_content_hash(event.model_dump())
+    session.add(event)
+    try:
+        await events_cache.invalidate(session)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Event already exists.")
+    await session.refresh(event)
     return event
 
 
-@app.patch("/events/{event_id}", response_model=Event)
-def update_event(event_id: int, event: Event) -> Event:
-    with Session(engine) as session:
-        db_event = session.get(Event, event_id)
-        if not db_event:
-            raise HTTPException(status_code=404, detail="Event not found")
-        event_data = event.model_dump(exclude_uset=True)
-        db_event.sqlmodel_update(event_data)
-        event.id = event_id
-        session.add(db_event)
-        session.commit()
-        session.refresh(db_event)
+@app.patch("/events/{event_id}", response_model=EventRead)
+async def update_event(event_id: int, event: EventUpdate, session: AsyncSession = Depends(get_async_session)) -> Event:
+    db_event = await session.get(Event, event_id)
+    if not db_event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    event_data = event.model_dump(exclude_unset=True)
+    db_event.sqlmodel_update(event_data)
+    db_event.content_hash = event_content_hash(db_event.model_dump())
+    session.add(db_event)
+    await events_cache.invalidate(session)
+    await session.refresh(db_event)
     return db_event
 
 
-@app.delete("/events/{event_id}", response_model=Event)
-def delete_event(event_id: int):
-    with Session(engine) as session:
-        event = session.get(Event, event_id)
-        if not event:
-            raise HTTPException(status_code=404, detail="Event not found.")
-        session.delete(event)
-        session.commit()
+@app.delete("/events/{event_id}", response_model=EventRead)
+async def delete_event(event_id: int, session: AsyncSession = Depends(get_async_session)):
+    event = await session.get(Event, event_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found.")
+    # The relationships never load, so the ORM can't see and delete the link rows pointing to the event.
+    for link_model in LINK_MODELS:
+        await session.execute(delete(link_model).where(link_model.event_id == event_id))
+    await session.delete(event)
+    await events_cache.invalidate(session)
     return event
 
 
-@app.delete("/users/{user_id}", response_model=User)
-def delete_user(user_id: int):
+@app.delete("/users/{user_id}", response_model=UserRead)
+async def delete_user(user_id: int, session: AsyncSession = Depends(get_async_session)):
     """Remove user from database."""
-    with Session(engine) as session:
-        user = session.get(User, user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found.")
-        session.delete(user)
-        session.commit()
+    user = await session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found.")
+    for link_model in LINK_MODELS:
+        await session.execute(delete(link_model).where(link_model.user_id == user_id))
+    await session.delete(user)
+    await session.commit()
+    forget_user(user.user_name)
     return user
 
 
-@app.post("/users/", response_model=User)
-def create_user(user: User) -> User:
+@app.post("/users/{user_id}/deactivate", response_model=UserRead)
+async def deactivate_user(
+    user_id: int,
+    current_user: User = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Mark user as inactive, their tokens stop working right away on this worker. Users can only deactivate themselves."""
+    if current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not allowed to deactivate this user.")
+    user = await session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found.")
+    user.active = False
+    session.add(user)
+    await session.commit()
+    forget_user(user.user_name)
+    return user
+
+
+@app.post("/users/", response_model=UserRead)
+async def create_user(user: User, session: AsyncSession = Depends(get_async_session)) -> User:
     """Create User in DB, return Error if User already exists in database."""
-    with Session(engine) as session:
-        existing_user = session.exec(
-            select(User).where(User.user_name == user.user_name, User.email == user.email)
-        ).first()
-        if existing_user:
-            raise HTTPException(status_code=409, detail="User already exists.")
-        else:
-            hashed_password = get_password_hash(user.password)
-            new_user = User(
-                user_name=user.user_name, email=user.email, password=user.password, hashed_password=hashed_password
-            )
-            session.add(new_user)
-            session.commit()
-            session.refresh(new_user)
+    existing_user = (
+        await session.exec(select(User).where(User.user_name == user.user_name, User.email == user.email))
+    ).first()
+    if existing_user:
+        raise HTTPException(status_code=409, detail="User already exists.")
+    else:
+        hashed_password = await password_hasher.hash(user.password)
+        new_user = User(
+            user_name=user.user_name, email=user.email, password=user.password, hashed_password=hashed_password
+        )
+        session.add(new_user)
+        await session.commit()
+        await session.refresh(new_user)
 
     return new_user
 
 
-@app.get("/user/{user_id}", response_model=User)
-def get_user(user: User) -> User:
-    with Session(engine) as session:
-        user = session.get(User, user.id)
-        if not user:
-            raise HTTPException(status_code=404, detail=f"User id {user.id} with username {user.user_name} not found")
+@app.get("/user/{user_id}", response_model=UserRead)
+async def get_user(user: User, session: AsyncSession = Depends(get_async_session)) -> User:
+    user = await session.get(User, user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail=f"User id {user.id} with username {user.user_name} not found")
     return user
 
 
-@app.get("/users/", response_model=list[User])
-def get_users(skip: int = 0, limit: int = 50) -> list[User]:
+@app.get("/users/", response_model=list[UserRead])
+async def get_users(
+    skip: int = 0, limit: int = 50, session: AsyncSession = Depends(get_async_session)
+) -> list[UserRead]:
     """
     Get all users.
     - **limit**: Maximum number of records to return.
         - **skip**: Amount of events skipped, query will pull the next 50 if available
     """
-    with Session(engine) as session:
-        statement = select(User).offset(skip).limit(limit)
-        users = session.exec(statement).all()
-        return users
+    statement = select(*USER_READ_COLUMNS).offset(skip).limit(limit)
+    users = (await session.exec(statement)).all()
+    return [user._asdict() for user in users]
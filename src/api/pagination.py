@@ -0,0 +1,70 @@
+import base64
+import binascii
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, tuple_
+
+from src.data.db_models import Event
+
+# Keyset pagination walks events in this order, backed by the ix_event_start_datetime_id index.
+KEYSET_ORDER = (Event.start_datetime, Event.id)
+
+
+def encode_cursor(start_datetime: datetime, event_id: int) -> str:
+    """Opaque cursor pointing right after the given event."""
+    raw = f"{start_datetime.isoformat()}|{event_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        start_datetime, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(start_datetime), int(event_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def after_cursor(cursor: str):
+    """Filter for events that come after the cursor in KEYSET_ORDER."""
+    return tuple_(*KEYSET_ORDER) > decode_cursor(cursor)
+
+
+def next_cursor(events: list, limit: int | None) -> str | None:
+    """Cursor for the following page, None when this page was the last one."""
+    if not limit or len(events) < limit:
+        return None
+    last_event = events[-1]
+    return encode_cursor(last_event.start_datetime, last_event.id)
+
+
+def encode_rank_cursor(relevance: float, event_id: int) -> str:
+    """Opaque cursor pointing right after the given event of relevance ranked results."""
+    raw = f"{relevance!r}|{event_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        relevance, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return float(relevance), int(event_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def after_rank_cursor(relevance, cursor: str):
+    """
+    Filter for events that come after the cursor, ordered by relevance descending and then id.
+    :param relevance: relevance expression the results are ranked by.
+    :param cursor: cursor from next_rank_cursor.
+    """
+    cursor_relevance, event_id = decode_rank_cursor(cursor)
+    return or_(relevance < cursor_relevance, and_(relevance == cursor_relevance, Event.id > event_id))
+
+
+def next_rank_cursor(events: list, limit: int | None) -> str | None:
+    """Cursor for the following page of ranked results, the rows need a relevance column."""
+    if not limit or len(events) < limit:
+        return None
+    last_event = events[-1]
+    return encode_rank_cursor(last_event.relevance, last_event.id)
@@ -0,0 +1,50 @@
+from typing import NamedTuple
+
+from fastapi import HTTPException
+from sqlalchemy import column, func, literal_column, table
+
+from src.data.db_models import Event
+
+# Both only exist in the databases built by the full text search migration, the Event model doesn't map them.
+SEARCH_VECTOR = literal_column("event.search_vector")
+EVENT_FTS = table("event_fts", column("rowid"), column("rank"))
+
+
+class FullTextSearch(NamedTuple):
+    """Clauses of a full text search, joined table and its onclause are None when no join is needed."""
+
+    condition: object
+    relevance: object
+    join_table: object = None
+    onclause: object = None
+
+
+def fts5_query(q: str) -> str:
+    """Search terms as an FTS5 query, every term quoted so user input can't use the query syntax."""
+    terms = ('"' + term.replace('"', '""') + '"' for term in q.split())
+    return " ".join(terms)
+
+
+def full_text_search(dialect_name: str, q: str) -> FullTextSearch:
+    """
+    Match events on their title, venue and category, relevance is higher for better matches.
+    :param dialect_name: Postgres uses the search_vector column, SQLite the event_fts table.
+    :param q: search terms, every term has to match.
+    """
+    match dialect_name:
+        case "postgresql":
+            query = func.websearch_to_tsquery("simple", q)
+            return FullTextSearch(
+                condition=SEARCH_VECTOR.op("@@")(query),
+                relevance=func.ts_rank_cd(SEARCH_VECTOR, query),
+            )
+        case "sqlite":
+            # bm25 ranks are negative, the best match has the lowest one.
+            return FullTextSearch(
+                condition=literal_column("event_fts").op("MATCH")(fts5_query(q)),
+                relevance=-EVENT_FTS.c.rank,
+                join_table=EVENT_FTS,
+                onclause=EVENT_FTS.c.rowid == Event.id,
+            )
+        case _:
+            raise HTTPException(status_code=501, detail="Full text search is not available on this database.")
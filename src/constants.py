@@ -6,14 +6,65 @@ SOURCE_ONE = "https://do512.com"
 SOURCE_TWO = "https://heyaustin.com/austin-events/"
 SOURCE_THREE = "https://austin.culturemap.com/events/?tags=20240920"
 
+# Detail pages are fetched concurrently, capped per host to stay polite with the source sites.
+SCRAPER_MAX_WORKERS = config("SCRAPER_MAX_WORKERS", default=8, cast=int)
+SCRAPER_REQUESTS_PER_SECOND = config("SCRAPER_REQUESTS_PER_SECOND", default=5.0, cast=float)
+
+# BeautifulSoup tree builder used by the scrapers: "lxml" (fast, C based) or "html.parser" (pure python).
+SCRAPER_PARSER = config("SCRAPER_PARSER", default="lxml")
+
+# CultureMap is rendered in Chromium, headless unless debugging. Images, fonts, media and ads are not downloaded.
+SCRAPER_HEADLESS = config("SCRAPER_HEADLESS", default=True, cast=bool)
+SCRAPER_BLOCK_RESOURCES = config("SCRAPER_BLOCK_RESOURCES", default=True, cast=bool)
+# Browser contexts kept open for reuse by a browser pool.
+SCRAPER_BROWSER_CONTEXTS = config("SCRAPER_BROWSER_CONTEXTS", default=2, cast=int)
+# How long a scroll waits for new content to show up before the page is considered fully loaded.
+SCRAPER_SCROLL_TIMEOUT_MS = config("SCRAPER_SCROLL_TIMEOUT_MS", default=2000, cast=int)
+
+# Keep-alive connections kept open per host by the shared scraper session.
+SCRAPER_POOL_SIZE = config("SCRAPER_POOL_SIZE", default=SCRAPER_MAX_WORKERS, cast=int)
+# Pages are stored here with their ETag / Last-Modified, unchanged pages are answered with a 304. Empty disables it.
+SCRAPER_HTTP_CACHE_DIR = config("SCRAPER_HTTP_CACHE_DIR", default=".scraper_cache")
+
 DATABASE_URL = config("DATABASE_URL")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+# Same database through asyncio drivers, used by the API so queries don't block the event loop.
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1).replace(
+    "sqlite://", "sqlite+aiosqlite://", 1
+)
+
+# Connection pool of each engine, size it so every worker stays under the plan's connection limit.
+DB_POOL_SIZE = config("DB_POOL_SIZE", default=5, cast=int)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=5, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=30, cast=int)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", default=True, cast=bool)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", default=1800, cast=int)
+# Postgres cancels statements running longer than this, 0 disables the limit.
+DB_STATEMENT_TIMEOUT_MS = config("DB_STATEMENT_TIMEOUT_MS", default=15000, cast=int)
+
+# Amount of scraped events written to the database per INSERT statement.
+INGEST_CHUNK_SIZE = config("INGEST_CHUNK_SIZE", default=500, cast=int)
+
+# Read-only event endpoints keep their responses in memory until the events change or the ttl expires.
+RESPONSE_CACHE_TTL = config("RESPONSE_CACHE_TTL", default=300, cast=int)
+RESPONSE_CACHE_MAX_ENTRIES = config("RESPONSE_CACHE_MAX_ENTRIES", default=1024, cast=int)
+# How long a worker trusts its last read of the cache generation before asking the database again.
+CACHE_GENERATION_CHECK_SECONDS = config("CACHE_GENERATION_CHECK_SECONDS", default=5, cast=int)
 
 SECRET_KEY = config("SECRET_KEY")
+# Authenticated users are kept in memory this long, bounds how stale another worker's copy can be.
+USER_CACHE_TTL = config("USER_CACHE_TTL", default=60, cast=int)
+USER_CACHE_MAX_ENTRIES = config("USER_CACHE_MAX_ENTRIES", default=1024, cast=int)
+# bcrypt runs on its own threads, at most this many hashes at once per worker, extra logins wait in line.
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", default=2, cast=int)
 
 EVENTS_API_URL = config("EVENTS_API_URL", default="http://127.0.0.1:8000")
 MAX_EVENTS_LIMIT = 50
+MAX_SEARCH_LIMIT = 500
 
 PREDICT_API = config("PREDICT_API")
+# Predict API pages are requested concurrently, every page asks for the same limit its offset advances by.
+PREDICT_API_PAGE_LIMIT = config("PREDICT_API_PAGE_LIMIT", default=200, cast=int)
+PREDICT_API_MAX_WORKERS = config("PREDICT_API_MAX_WORKERS", default=4, cast=int)
 ACCESS_TOKEN = config("EVENTS_HQ_TOKEN")
@@ -0,0 +1,113 @@
+import threading
+import time
+
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlmodel import create_engine
+
+from src.constants import (
+    ASYNC_DATABASE_URL,
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_TIMEOUT_MS,
+)
+
+
+class TimedPoolMixin:
+    """Records how long checkouts waited for a connection, SQLAlchemy pools only report their current usage."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._wait_lock = threading.Lock()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            with self._wait_lock:
+                self.checkouts += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+    def wait_stats(self) -> tuple[int, float, float]:
+        """Amount of checkouts, total and longest seconds they waited."""
+        with self._wait_lock:
+            return self.checkouts, self.total_wait, self.max_wait
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """
+    Pool and connection arguments of an engine, read from the DB_* settings.
+    :param url: database url the engine connects to.
+    :param is_async: options for an asyncio driver, they take the statement timeout differently.
+    """
+    url = make_url(url)
+    # In-memory SQLite keeps a single connection per thread, there is no pool to size.
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+
+    options = {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+    if url.get_backend_name() == "postgresql" and DB_STATEMENT_TIMEOUT_MS:
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def create_db_engine(url: str = DATABASE_URL):
+    return create_engine(url, **engine_options(url))
+
+
+def create_async_db_engine(url: str = ASYNC_DATABASE_URL):
+    return create_async_engine(url, **engine_options(url, is_async=True))
+
+
+# One engine per process for each driver, the schema itself is managed by the Alembic migrations.
+engine = create_db_engine()
+# The API runs on the asyncio drivers, scrapers and migrations keep the sync engine above.
+async_engine = create_async_db_engine()
+
+
+def pool_metrics(engine) -> dict:
+    """Current usage and checkout wait times of the connection pool of an engine."""
+    pool = engine.pool
+    if not isinstance(pool, TimedPoolMixin):
+        return {"status": pool.status()}
+    checkouts, total_wait, max_wait = pool.wait_stats()
+    return {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # Negative while the pool hasn't opened pool_size connections yet.
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checkouts": checkouts,
+        "average_wait_ms": total_wait / checkouts * 1000 if checkouts else 0.0,
+        "max_wait_ms": max_wait * 1000,
+    }
@@ -1,7 +1,24 @@
-from sqlmodel import Session, SQLModel, create_engine, select
-from src.data.db_models import Event, User, TokenData
-from src.constants import DATABASE_URL, SECRET_KEY
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import tuple_, update
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.data.database import async_engine, engine
+from src.data.db_models import CacheGeneration, Event, User, TokenData
+from src.constants import (
+    INGEST_CHUNK_SIZE,
+    PASSWORD_HASH_WORKERS,
+    SECRET_KEY,
+    USER_CACHE_MAX_ENTRIES,
+    USER_CACHE_TTL,
+)
+from src.ttl_cache import TTLCache
 from datetime import datetime, timedelta, timezone
+from itertools import batched
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -9,12 +26,9 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 
-engine = create_engine(DATABASE_URL)
-SQLModel.metadata.create_all(engine)
-
-
-def get_session():
-    with Session(engine) as session:
+async def get_async_session():
+    # Objects stay readable after commit, an async session can't lazily refresh them while they are serialized.
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
         yield session
 
 
@@ -34,18 +48,68 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
-def get_user_by_username(session, username: str):
+class PasswordHasher:
+    """
+    Runs bcrypt on a bounded pool of threads so a burst of logins doesn't stall the event loop.
+    Keeps how long calls waited for a free thread, the sign the pool is too small.
+    """
+
+    def __init__(self, max_workers: int = PASSWORD_HASH_WORKERS):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self.calls = 0
+        self.waiting = 0
+        self.total_queue_time = 0.0
+        self.max_queue_time = 0.0
+        self._lock = threading.Lock()
+
+    async def run(self, func, *args):
+        submitted = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+
+        def timed():
+            queued = time.perf_counter() - submitted
+            with self._lock:
+                self.waiting -= 1
+                self.calls += 1
+                self.total_queue_time += queued
+                self.max_queue_time = max(self.max_queue_time, queued)
+            return func(*args)
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+
+    async def verify(self, plain_password, hashed_password) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password) -> str:
+        return await self.run(get_password_hash, password)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "waiting": self.waiting,
+                "calls": self.calls,
+                "average_queue_ms": self.total_queue_time / self.calls * 1000 if self.calls else 0.0,
+                "max_queue_ms": self.max_queue_time * 1000,
+            }
+
+
+password_hasher = PasswordHasher()
+
+
+async def get_user_by_username(session: AsyncSession, username: str):
     query = select(User).where(User.user_name == username)
-    user = session.exec(query).first()
+    user = (await session.exec(query)).first()
     return user
 
 
-def authenticate_user(session, username: str, password: str):
-    query = select(User).where(User.user_name == username)
-    user = session.exec(query).first()
+async def authenticate_user(session: AsyncSession, username: str, password: str):
+    user = await get_user_by_username(session, username)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await password_hasher.verify(password, user.hashed_password):
         return False
     return user
 
@@ -62,7 +126,16 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return encode_jwt
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)):
+# Active users by username, saves the user lookup on most authenticated requests.
+user_cache = TTLCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL)
+
+
+def forget_user(username: str):
+    """Drop a cached user, call whenever a user is deleted or deactivated."""
+    user_cache.pop(username)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_async_session)):
     credential_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials.",
@@ -79,10 +152,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme), session: Session
     except JWTError:
         raise credential_exception
 
-    user = get_user_by_username(session, username=token_data.username)
-
+    user = user_cache.get(token_data.username)
     if user is None:
-        raise credential_exception
+        user = await get_user_by_username(session, username=token_data.username)
+        if user is None:
+            raise credential_exception
+        if user.active:
+            user_cache.set(token_data.username, user)
     return user
 
 
@@ -92,28 +168,135 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     return current_user
 
 
+### CACHE INVALIDATION
+EVENTS_GENERATION = "events"
+
+
+def get_cache_generation(session, name: str = EVENTS_GENERATION) -> int:
+    generation = session.exec(select(CacheGeneration.generation).where(CacheGeneration.name == name)).first()
+    return generation or 0
+
+
+def bump_cache_generation(session, name: str = EVENTS_GENERATION):
+    """Mark cached data as stale for every API worker, committed along with the session."""
+    bumped = session.execute(
+        update(CacheGeneration).where(CacheGeneration.name == name).values(generation=CacheGeneration.generation + 1)
+    ).rowcount
+    if not bumped:
+        session.add(CacheGeneration(name=name, generation=1))
+
+
 ### ADDING EVENTS TO DB FROM WEBSCRAPERS
-def add_events_to_db(events):
+def conflict_ignoring_insert(dialect_name: str):
+    """The dialect's insert construct, which supports on_conflict_do_nothing, None for databases without it."""
+    match dialect_name:
+        case "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        case "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        case _:
+            return None
+    return insert
+
+
+def insert_events_ignore_duplicates(session, rows: list[dict]) -> int:
+    """
+    Insert a chunk of events in a single statement, skipping those already stored.
+    Duplicates are detected by the unique (title, start_datetime) index, returns the amount inserted.
+    """
+    insert = conflict_ignoring_insert(session.get_bind().dialect.name)
+    if insert is None:
+        return insert_events_one_by_one(session, rows)
+
+    statement = insert(Event).values(rows).on_conflict_do_nothing(index_elements=["title", "start_datetime"])
+    return session.execute(statement).rowcount
+
+
+def insert_events_one_by_one(session, rows: list[dict]) -> int:
+    """Fallback for databases without ON CONFLICT support, checks each event before adding it."""
     events_added = 0
-    # check if events already exsits based on title and start_datetime
+    for row in rows:
+        existing_event = session.exec(
+            select(Event.id).where(
+                Event.title == row["title"],
+                Event.start_datetime == row["start_datetime"],
+            )
+        ).first()
+        if existing_event is None:
+            session.add(Event(**row))
+            session.flush()
+            events_added += 1
+    return events_added
+
+
+def event_content_hash(row: dict) -> str:
+    """Digest of the fields of an event that may change once scraped, ignoring case and whitespace differences."""
+    fields = (row["venue"], row["category"], row["event_link"])
+    normalized = "\x1f".join(" ".join((value or "").split()).casefold() for value in fields)
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def stored_event_hashes(session, rows: list[dict]) -> dict[tuple, tuple[int, str | None]]:
+    """Id and content hash of the stored events matching a chunk of rows, keyed by (title, start_datetime)."""
+    keys = {(row["title"], row["start_datetime"]) for row in rows}
+    stored = session.exec(
+        select(Event.title, Event.start_datetime, Event.id, Event.content_hash).where(
+            tuple_(Event.title, Event.start_datetime).in_(keys)
+        )
+    )
+    return {
+        (title, start_datetime): (event_id, content_hash) for title, start_datetime, event_id, content_hash in stored
+    }
+
+
+def add_events_to_db(events, chunk_size: int = INGEST_CHUNK_SIZE) -> tuple[int, int, int]:
+    """
+    Add scraped events to the database in chunks, each chunk is committed on its own.
+    Events already stored are updated only when their content hash changed.
+    :param events: iterable of scraped events, consumed lazily.
+    :param chunk_size: amount of events sent per INSERT statement.
+    Returns the amount of events inserted, updated and left unchanged.
+    """
+    events_added = 0
+    events_updated = 0
+    events_unchanged = 0
     with Session(engine) as session:
-        for event in events:
-            existing_event = session.exec(
-                select(Event).where(
-                    Event.title == event.title,
-                    Event.start_datetime == event.start_datetime,
-                )
-            ).first()
-
-            if existing_event is None:
-                new_event = Event(
-                    **event._asdict(),
-                )
-                session.add(new_event)
-                events_added += 1
-
-            else:
-                print(f"This event {event.title} on {event.start_datetime} already exists in database")
-        print(f"A total of {events_added} Events were added to the database.")
-
-        session.commit()
+        for chunk in batched(events, chunk_size):
+            # The last copy wins when a source lists the same event twice in a chunk.
+            rows = {}
+            for event in chunk:
+                row = event._asdict()
+                row["content_hash"] = event_content_hash(row)
+                rows[(row["title"], row["start_datetime"])] = row
+
+            stored = stored_event_hashes(session, list(rows.values()))
+            new_rows = [row for key, row in rows.items() if key not in stored]
+            # Rows stored before hashing existed have no hash yet, updating them fills it in.
+            changed_rows = [
+                {
+                    "id": stored[key][0],
+                    "venue": row["venue"],
+                    "category": row["category"],
+                    "event_link": row["event_link"],
+                    "content_hash": row["content_hash"],
+                }
+                for key, row in rows.items()
+                if key in stored and stored[key][1] != row["content_hash"]
+            ]
+
+            inserted = insert_events_ignore_duplicates(session, new_rows) if new_rows else 0
+            if changed_rows:
+                # Bulk UPDATE by primary key, one executemany for the whole chunk.
+                session.execute(update(Event), changed_rows)
+            if inserted or changed_rows:
+                bump_cache_generation(session)
+            session.commit()
+            events_added += inserted
+            events_updated += len(changed_rows)
+            events_unchanged += len(chunk) - inserted - len(changed_rows)
+
+    print(
+        f"A total of {events_added} Events were added to the database, {events_updated} were updated, "
+        f"{events_unchanged} were unchanged."
+    )
+    return events_added, events_updated, events_unchanged
@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
 from typing import List
 from datetime import datetime
@@ -13,15 +14,49 @@ class UserEventsSaved(SQLModel, table=True):
     event_id: int = Field(default=None, foreign_key="event.id", primary_key=True)
 
 
+# Relationships are never loaded implicitly, queries that need them opt in with selectinload.
+# Neither can the ORM cascade deletes through them, endpoints deleting events or users delete their link rows.
+NO_LAZY_LOAD = {"lazy": "noload"}
+
+
 class Event(SQLModel, table=True):
+    # Trigram indexes on venue and category are Postgres only, they live in the migrations.
+    # So does the full text search, the search_vector column on Postgres and the event_fts table on SQLite.
+    __table_args__ = (
+        Index("ix_event_title_start_datetime", "title", "start_datetime", unique=True),
+        Index("ix_event_start_datetime_id", "start_datetime", "id"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     title: str
     venue: str
     start_datetime: datetime
     category: str | None = None
     event_link: str | None = None
-    attendees: List["User"] = Relationship(back_populates="events_attended", link_model=UserEventsAttended)
-    saved_by: List["User"] = Relationship(back_populates="events_saved", link_model=UserEventsSaved)
+    # Digest of venue, category and event_link, lets ingest spot changed events without comparing every field.
+    content_hash: str | None = None
+    attendees: List["User"] = Relationship(
+        back_populates="events_attended", link_model=UserEventsAttended, sa_relationship_kwargs=NO_LAZY_LOAD
+    )
+    saved_by: List["User"] = Relationship(
+        back_populates="events_saved", link_model=UserEventsSaved, sa_relationship_kwargs=NO_LAZY_LOAD
+    )
+
+
+class ScrapeState(SQLModel, table=True):
+    """What the last run of a scraper source saw, lets incremental runs skip pages already seen."""
+
+    source: str = Field(primary_key=True)
+    high_water_mark: datetime | None = None
+    page_fingerprints: str = "{}"
+    updated_at: datetime | None = None
+
+
+class CacheGeneration(SQLModel, table=True):
+    """Counter bumped on every write to a cached table, API workers drop cached responses when it changes."""
+
+    name: str = Field(primary_key=True)
+    generation: int = 0
 
 
 class UserBase(SQLModel):
@@ -34,8 +69,50 @@ class UserBase(SQLModel):
 class User(UserBase, table=True):
     id: int | None = Field(default=None, primary_key=True)
     active: bool = True
-    events_attended: List[Event] = Relationship(back_populates="attendees", link_model=UserEventsAttended)
-    events_saved: List[Event] = Relationship(back_populates="saved_by", link_model=UserEventsSaved)
+    events_attended: List[Event] = Relationship(
+        back_populates="attendees", link_model=UserEventsAttended, sa_relationship_kwargs=NO_LAZY_LOAD
+    )
+    events_saved: List[Event] = Relationship(
+        back_populates="saved_by", link_model=UserEventsSaved, sa_relationship_kwargs=NO_LAZY_LOAD
+    )
+
+
+class EventRead(SQLModel):
+    id: int
+    title: str
+    venue: str
+    start_datetime: datetime
+    category: str | None = None
+    event_link: str | None = None
+
+
+class EventCreate(SQLModel):
+    """Body of a new event, table models aren't validated so start_datetime would reach the driver as a string."""
+
+    title: str
+    venue: str
+    start_datetime: datetime
+    category: str | None = None
+    event_link: str | None = None
+
+
+class EventUpdate(SQLModel):
+    title: str | None = None
+    venue: str | None = None
+    start_datetime: datetime | None = None
+    category: str | None = None
+    event_link: str | None = None
+
+
+class UserRead(SQLModel):
+    id: int
+    user_name: str
+    email: str
+    active: bool
+
+
+class EventIdsRequest(SQLModel):
+    event_ids: list[int]
 
 
 class Token(SQLModel):
@@ -0,0 +1,80 @@
+import hashlib
+import json
+from collections.abc import Iterable
+from datetime import datetime
+
+from sqlmodel import Session
+
+from src.data.database import engine
+from src.data.db_helper import event_content_hash, stored_event_hashes
+from src.data.db_models import ScrapeState
+
+
+class IncrementalScrape:
+    """
+    Tells a paginating scraper which listing pages it can skip, based on what previous runs of the same source saw.
+    A run skips listing pages unchanged since last time and pages whose events are all already stored unchanged.
+    Listings are ordered by event date rather than posting time, a new event can show up on any page,
+    so every page is still walked.
+    With skip_seen off, pages are still fingerprinted so the next incremental run can use them.
+    """
+
+    def __init__(self, source: str, skip_seen: bool = True):
+        self.source = source
+        self.skip_seen = skip_seen
+        with Session(engine) as session:
+            state = session.get(ScrapeState, source)
+        self.high_water_mark = state.high_water_mark if state is not None else None
+        self.previous_fingerprints = json.loads(state.page_fingerprints) if state is not None else {}
+        self.fingerprints = {}
+        self.latest_seen = None
+
+    def page_unchanged(self, page_url: str, page_keys: Iterable[str]) -> bool:
+        """
+        Record the fingerprint of a listing page, True when the scraper can skip reading it.
+        :param page_keys: identifies the listings of the page, e.g. their links or event_keys of their events.
+        """
+        fingerprint = hashlib.sha256("\n".join(page_keys).encode()).hexdigest()
+        self.fingerprints[page_url] = fingerprint
+        return self.skip_seen and self.previous_fingerprints.get(page_url) == fingerprint
+
+    @staticmethod
+    def event_keys(events: list) -> list[str]:
+        """Page keys of parsed events, they change whenever an event's content does and not only its link."""
+        return [
+            f"{event.title}|{event.start_datetime.isoformat()}|{event_content_hash(event._asdict())}"
+            for event in events
+        ]
+
+    def all_ingested(self, events: list) -> bool:
+        """True when the scraper can skip the events of a page, every one of them is already stored unchanged."""
+        if not events:
+            return False
+        page_latest = max(event.start_datetime for event in events)
+        self.latest_seen = max(self.latest_seen or page_latest, page_latest)
+        if not self.skip_seen:
+            return False
+        # Events past the high water mark can't have been ingested yet, no need to ask the database.
+        if self.high_water_mark is None or page_latest > self.high_water_mark:
+            return False
+
+        rows = [event._asdict() for event in events]
+        with Session(engine) as session:
+            stored = stored_event_hashes(session, rows)
+        # A single new or changed event has to reach ingest.
+        return all(
+            stored.get((row["title"], row["start_datetime"]), (None, None))[1] == event_content_hash(row)
+            for row in rows
+        )
+
+    def save(self):
+        """Store what this run saw, call once its events are ingested."""
+        with Session(engine) as session:
+            state = session.get(ScrapeState, self.source) or ScrapeState(source=self.source)
+            fingerprints = {**self.previous_fingerprints, **self.fingerprints}
+            state.page_fingerprints = json.dumps(fingerprints)
+            if self.latest_seen is not None:
+                state.high_water_mark = max(self.high_water_mark or self.latest_seen, self.latest_seen)
+            state.updated_at = datetime.now()
+            session.add(state)
+            session.commit()
@@ -1,8 +1,7 @@
 import streamlit as st
 import requests
-import pandas as pd
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from operator import itemgetter
 from constants import EVENTS_API_URL, MAX_EVENTS_LIMIT
 
 st.set_page_config(layout="centered")
@@ -10,11 +9,18 @@ st.title("Events in Austin Texas")
 st.write("Here are some upcoming events:")
 
 
-@st.cache_data(show_spinner=False)
-def get_events() -> list:
-    """Loads events sorted by start_datetime, starting with the current date"""
+@st.cache_resource
+def get_page_fetcher() -> ThreadPoolExecutor:
+    """Background workers shared by every session to fetch and prefetch event pages."""
+    return ThreadPoolExecutor(max_workers=4)
 
-    params = {"from_date": datetime.now()}
+
+def get_events(from_date: datetime, cursor: str | None = None) -> dict:
+    """Loads one page of events sorted by start_datetime, starting with from_date"""
+
+    params = {"from_date": from_date, "limit": MAX_EVENTS_LIMIT}
+    if cursor is not None:
+        params["cursor"] = cursor
     response = requests.get(url=EVENTS_API_URL + "/search_events/", params=params)
     response.raise_for_status()
 
@@ -23,52 +29,98 @@ def get_events() -> list:
     return events_response
 
 
-def user_saved_events(event_id: int, token: str):
-    """Updates user saved events into database."""
-    data = {"event_id": event_id}
+def request_events_page(cursor: str | None) -> Future:
+    """Starts fetching the page after cursor in the background, pages are kept for the whole session."""
+    pages = st.session_state.setdefault("events_pages", {})
+    if cursor not in pages:
+        # Truncated to the hour so sessions send the same from_date and share the API's cached responses.
+        from_date = st.session_state.setdefault(
+            "events_from_date", datetime.now().replace(minute=0, second=0, microsecond=0)
+        )
+        pages[cursor] = get_page_fetcher().submit(get_events, from_date, cursor)
+    return pages[cursor]
+
+
+def load_events_page(page_number: int) -> dict:
+    """
+    Returns the events of the requested page and prefetches the following one.
+    Pages are reached through the cursor of the page before them, unseen pages in between are loaded on the way.
+    """
+    page_cursors = st.session_state.setdefault("page_cursors", {1: None})
+    known_page = max(page for page in page_cursors if page <= page_number)
+    while True:
+        cursor = page_cursors[known_page]
+        try:
+            events_page = request_events_page(cursor).result()
+        except requests.RequestException:
+            # Forget the failed request so the next rerun tries again.
+            del st.session_state["events_pages"][cursor]
+            raise
+        if events_page["next_cursor"] is not None:
+            page_cursors[known_page + 1] = events_page["next_cursor"]
+        if known_page == page_number or events_page["next_cursor"] is None:
+            break
+        known_page += 1
+
+    if events_page["next_cursor"] is not None:
+        request_events_page(events_page["next_cursor"])
+    return events_page
+
+
+def get_saved_event_ids(token: str) -> set[int]:
+    """Ids of every event the user saved, loaded once per session."""
+    headers = {"Authorization": f"Bearer {token}"}
+    response = requests.get(url=EVENTS_API_URL + "/users/me/events/saved/ids", headers=headers)
+    response.raise_for_status()
+    return set(response.json()["event_ids"])
+
+
+def user_saved_events(event_ids: list[int], token: str):
+    """Saves events for the user in database, a single request for every event toggled on."""
+    data = {"event_ids": event_ids}
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-    response = requests.post(url=EVENTS_API_URL + "/users/me/events/saved", json=data, headers=headers)
+    response = requests.post(url=EVENTS_API_URL + "/users/me/events/saved/bulk", json=data, headers=headers)
     if response.status_code == 200:
-        print("Event successfully saved.")
-    elif response.status_code == 409:
-        print("Event is already saved for this user.")
+        print(f"{response.json()['saved']} events successfully saved.")
     else:
-        print("Failed to save event: ", response.status_code, response.text)
+        print("Failed to save events: ", response.status_code, response.text)
     return response.json()
 
 
-## TODO: ADD REMOVE SAVED EVENTS when checkbox toggled off. When page loads for logged_in user make api call to get user saved_events.
-def user_unsaved_events(event_id: int, token: str):
-    """Removes unsaved events from user info in database."""
-    data = {"event_id": event_id}
+def user_unsaved_events(event_ids: list[int], token: str):
+    """Removes unsaved events from user info in database, a single request for every event toggled off."""
+    data = {"event_ids": event_ids}
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-    response = requests.delete(url=EVENTS_API_URL + "/users/me/events/saved", json=data, headers=headers)
-    print(response.json())
+    response = requests.delete(url=EVENTS_API_URL + "/users/me/events/saved/bulk", json=data, headers=headers)
+    if response.status_code == 200:
+        print(f"{response.json()['removed']} events successfully removed.")
+    else:
+        print("Failed to remove saved events: ", response.status_code, response.text)
+    return response.json()
 
 
 def load_main_page():
-    # Load page first time
-    events_loaded = get_events()
-    total_events = events_loaded["total_events"]
+    # Load page first time, it holds the total of events
+    total_events = load_events_page(1)["total_events"]
 
     # Calculate total pages
     events_per_page = MAX_EVENTS_LIMIT
-    total_pages = (total_events // events_per_page) + (total_events % events_per_page > 0)
+    total_pages = max((total_events // events_per_page) + (total_events % events_per_page > 0), 1)
 
     # Sidebar for pagination
     page_number = st.sidebar.number_input("Select Page:", 1, total_pages, 1)
 
-    # Load events for the current page
-    events_returned = events_loaded["events"]
-    events_returned.sort(key=itemgetter("start_datetime"))
-    df = pd.DataFrame(events_returned)
-
-    start_index = (page_number - 1) * events_per_page
-    end_index = start_index + events_per_page
-
-    # Create a list to store saved events
-    saved_events = st.session_state.get("saved_events", [])
-    for index, row in df.iloc[start_index:end_index].iterrows():
+    # Load events for the current page only, already sorted by the API
+    events_returned = load_events_page(page_number)["events"]
+
+    # Saved events of the user, changes made on this page are sent together once it is rendered
+    logged_in = st.session_state.get("logged_in")
+    if logged_in and "saved_events" not in st.session_state:
+        st.session_state["saved_events"] = get_saved_event_ids(st.session_state.token)
+    saved_events = st.session_state.get("saved_events", set())
+    events_to_save = []
+    events_to_unsave = []
+    for row in events_returned:
         dt = datetime.fromisoformat(row["start_datetime"])
         friendly_start_time = dt.strftime("%B %d, %Y, %I:%M %p")
         st.markdown(f"**{row['title']}**")
@@ -78,18 +130,21 @@ def load_main_page():
 
         event_id = row["id"]
         is_saved = event_id in saved_events
-        if st.session_state.get("logged_in"):
-            current_token = st.session_state.token
+        if logged_in:
             if st.checkbox("Save Event", value=is_saved, key=event_id):
-                if event_id not in saved_events:
-                    saved_events.append(event_id)
-                    save_event = user_saved_events(event_id, current_token)
-                    print(save_event)
-                else:
-                    if event_id in saved_events:
-                        saved_events.remove(event_id)
+                if not is_saved:
+                    events_to_save.append(event_id)
+            elif is_saved:
+                events_to_unsave.append(event_id)
 
         st.markdown("--------------------")
+
+    if events_to_save:
+        user_saved_events(events_to_save, st.session_state.token)
+        saved_events.update(events_to_save)
+    if events_to_unsave:
+        user_unsaved_events(events_to_unsave, st.session_state.token)
+        saved_events.difference_update(events_to_unsave)
     st.session_state["saved_events"] = saved_events
 
 
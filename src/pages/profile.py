@@ -63,6 +63,8 @@ with tab2:
         if token_data:
             token = token_data["access_token"]
             st.session_state.token = token
+            # Saved events belong to the previous user, the main page loads them again for this one.
+            st.session_state.pop("saved_events", None)
 
             user_details = get_user_details(token)
             if user_details:
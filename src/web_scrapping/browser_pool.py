@@ -0,0 +1,94 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from playwright.sync_api import BrowserContext, Page, Route, sync_playwright
+
+from src.constants import SCRAPER_BLOCK_RESOURCES, SCRAPER_BROWSER_CONTEXTS, SCRAPER_HEADLESS
+
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_HOSTS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googletagmanager.com",
+    "google-analytics.com",
+    "googleadservices.com",
+    "amazon-adsystem.com",
+    "adnxs.com",
+    "facebook.net",
+    "taboola.com",
+    "outbrain.com",
+)
+
+
+def block_heavy_resources(route: Route):
+    """Abort requests for images, fonts, media and ads, none of them are needed to read the events."""
+    request = route.request
+    host = urlsplit(request.url).hostname or ""
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or host.endswith(BLOCKED_HOSTS):
+        route.abort()
+    else:
+        route.continue_()
+
+
+class BrowserPool:
+    """
+    Chromium browser kept open between scrapes, pages are opened in reusable contexts.
+    Playwright's sync API is bound to the thread that started it, use a pool from a single thread.
+    """
+
+    def __init__(
+        self,
+        headless: bool = SCRAPER_HEADLESS,
+        block_resources: bool = SCRAPER_BLOCK_RESOURCES,
+        max_idle_contexts: int = SCRAPER_BROWSER_CONTEXTS,
+    ):
+        self.headless = headless
+        self.block_resources = block_resources
+        self.max_idle_contexts = max_idle_contexts
+        self.playwright = None
+        self.browser = None
+        self.idle_contexts: list[BrowserContext] = []
+
+    def start(self) -> "BrowserPool":
+        if self.browser is None:
+            self.playwright = sync_playwright().start()
+            self.browser = self.playwright.chromium.launch(headless=self.headless)
+        return self
+
+    def new_context(self) -> BrowserContext:
+        context = self.browser.new_context()
+        if self.block_resources:
+            context.route("**/*", block_heavy_resources)
+        return context
+
+    @contextmanager
+    def page(self) -> Iterator[Page]:
+        """Open a page in an idle context, the context goes back to the pool once the page is closed."""
+        self.start()
+        context = self.idle_contexts.pop() if self.idle_contexts else self.new_context()
+        page = context.new_page()
+        try:
+            yield page
+        finally:
+            page.close()
+            if len(self.idle_contexts) < self.max_idle_contexts:
+                self.idle_contexts.append(context)
+            else:
+                context.close()
+
+    def close(self):
+        for context in self.idle_contexts:
+            context.close()
+        self.idle_contexts = []
+        if self.browser is not None:
+            self.browser.close()
+            self.playwright.stop()
+        self.browser = None
+        self.playwright = None
+
+    def __enter__(self) -> "BrowserPool":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
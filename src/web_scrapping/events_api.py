@@ -1,40 +1,37 @@
 import json
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-import requests
 from decouple import config
+from tenacity import retry, stop_after_attempt, wait_exponential
 
+from src.web_scrapping.http_client import session
 from src.web_scrapping.web_scraper import Event
-from src.constants import MAX_EVENTS_LIMIT
+from src.constants import PREDICT_API_MAX_WORKERS, PREDICT_API_PAGE_LIMIT
 
 base_url = config("PREDICT_API")
 access_token = config("EVENTS_HQ_TOKEN")
 
 
-def get_events(offset) -> dict:
+@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=0.5))
+def get_events(offset: int, limit: int = PREDICT_API_PAGE_LIMIT) -> dict:
     headers = {"Authorization": "Bearer " + access_token, "Accept": "application/json"}
-    params = {"q": "Austin,Texas", "limit": 188, "offset": offset}
+    params = {"q": "Austin,Texas", "limit": limit, "offset": offset}
 
-    response = requests.get(url=base_url, headers=headers, params=params)
+    response = session.get(url=base_url, headers=headers, params=params, timeout=10)
     response.raise_for_status()
     austin_data = json.loads(response.text)
     return austin_data
 
 
-def get_predict_api_events() -> list[Event]:
-    """Call Predict API and get all events from"""
-    offset = 0
-    all_events = []
-
-    while True:
-        events = get_events(offset)
-        if not events["results"]:
-            break
-        all_events.extend(events["results"])
-        offset += MAX_EVENTS_LIMIT
-
-    events_list = []
-    for atx_event in all_events:
+def events_from_results(results: Iterable[dict], seen_ids: set) -> Iterator[Event]:
+    """Turn Predict API results into events, skipping ids already seen and city wide alerts."""
+    for atx_event in results:
+        if atx_event["id"] in seen_ids:
+            continue
+        seen_ids.add(atx_event["id"])
+
         if "formatted_address" not in atx_event["geo"]["address"]:
             print("This is a city wide alert, not an event.")
             continue
@@ -42,13 +39,34 @@ def get_predict_api_events() -> list[Event]:
         event_time = atx_event["start_local"]
         start_time = datetime.strptime(event_time, "%Y-%m-%dT%H:%M:%S")
 
-        event = Event(
+        yield Event(
             atx_event["title"],
             start_time,
             atx_event["geo"]["address"]["formatted_address"],
             atx_event["category"],
             None,
         )
-        events_list.append(event)
 
-    return events_list
+
+def iter_predict_api_events(
+    limit: int = PREDICT_API_PAGE_LIMIT, max_workers: int = PREDICT_API_MAX_WORKERS
+) -> Iterator[Event]:
+    """
+    Yield all Austin events from the Predict API.
+    The first page gives the total count, the remaining pages are fetched concurrently.
+    :param limit: events requested per page, offsets advance by the same amount.
+    :param max_workers: amount of pages fetched at the same time.
+    """
+    first_page = get_events(0, limit)
+    seen_ids = set()
+    yield from events_from_results(first_page["results"], seen_ids)
+
+    offsets = range(limit, first_page["count"], limit)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for page in executor.map(lambda offset: get_events(offset, limit), offsets):
+            yield from events_from_results(page["results"], seen_ids)
+
+
+def get_predict_api_events() -> list[Event]:
+    """Call Predict API and get all events from"""
+    return list(iter_predict_api_events())
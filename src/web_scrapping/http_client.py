@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.constants import SCRAPER_HTTP_CACHE_DIR, SCRAPER_POOL_SIZE
+
+headers = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/104.0.5112.79 Safari/537.36",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Accept-Language": "en-US, en; q=0.5",
+    "Accept": "text/html, application/xhtml+xml",
+}
+
+
+class FetchedPage(NamedTuple):
+    url: str
+    text: str
+    not_modified: bool
+
+
+def build_session(pool_size: int = SCRAPER_POOL_SIZE) -> requests.Session:
+    """Session keeping connections alive between requests, shared by every scraper source."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(headers)
+    return session
+
+
+class HttpCache:
+    """
+    On-disk store of fetched pages and their validators, one json file per url.
+    Scrapers can also keep what they parsed from a page, valid for as long as the page is not modified.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def load(self, url: str) -> dict | None:
+        try:
+            return json.loads(self.path(url).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def store(self, url: str, entry: dict):
+        # Written to a temporary file first so concurrent readers never see a partial entry.
+        with tempfile.NamedTemporaryFile("w", dir=self.directory, delete=False) as tmp:
+            json.dump(entry, tmp)
+        os.replace(tmp.name, self.path(url))
+
+    @staticmethod
+    def validators(entry: dict | None) -> dict:
+        """Conditional request headers for a cached page."""
+        if entry is None:
+            return {}
+        conditional = {}
+        if entry.get("etag"):
+            conditional["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            conditional["If-Modified-Since"] = entry["last_modified"]
+        return conditional
+
+    def load_parsed(self, url: str) -> Any | None:
+        entry = self.load(url)
+        return entry.get("parsed") if entry is not None else None
+
+    def store_parsed(self, url: str, parsed: Any):
+        entry = self.load(url)
+        if entry is not None:
+            entry["parsed"] = parsed
+            self.store(url, entry)
+
+
+session = build_session()
+http_cache = HttpCache(SCRAPER_HTTP_CACHE_DIR) if SCRAPER_HTTP_CACHE_DIR else None
+
+
+def fetch(url: str, timeout: int = 10) -> FetchedPage:
+    """
+    GET a page through the shared session, revalidating the cached copy when there is one.
+    A 304 answer returns the cached body with not_modified set.
+    """
+    cached = http_cache.load(url) if http_cache is not None else None
+    conditional = HttpCache.validators(cached)
+    response = session.get(url, headers=conditional, timeout=timeout)
+    if response.status_code == 304 and conditional:
+        return FetchedPage(url, cached["body"], not_modified=True)
+    response.raise_for_status()
+
+    if http_cache is not None and ("ETag" in response.headers or "Last-Modified" in response.headers):
+        http_cache.store(
+            url,
+            {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "body": response.text,
+            },
+        )
+    return FetchedPage(url, response.text, not_modified=False)
@@ -1,23 +1,49 @@
+import threading
 import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import NamedTuple
+from typing import Callable, Iterator, NamedTuple
+from urllib.parse import urljoin, urlsplit
 
-import requests
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+from bs4 import BeautifulSoup, SoupStrainer
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from tenacity import retry, stop_after_attempt, wait_exponential
 
-from src.constants import SOURCE_ONE
+from src.constants import (
+    SCRAPER_MAX_WORKERS,
+    SCRAPER_PARSER,
+    SCRAPER_REQUESTS_PER_SECOND,
+    SCRAPER_SCROLL_TIMEOUT_MS,
+    SOURCE_ONE,
+    SOURCE_TWO,
+)
+from src.web_scrapping.browser_pool import BrowserPool
+from src.web_scrapping.http_client import FetchedPage, fetch, http_cache
 
 INCOMPLETE_INFO = "Important event information is missing from event descriptions."
-HEADLESS = False
 
-headers = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/104.0.5112.79 Safari/537.36",
-    "Accept-Encoding": "gzip, deflate",
-    "Accept-Language": "en-US, en; q=0.5",
-    "Accept": "text/html, application/xhtml+xml",
-}
+
+def has_any_class(*class_names: str) -> SoupStrainer:
+    """
+    Strainer keeping elements with any of these css classes, and everything inside them.
+    While parsing, the class attribute is still the raw string, so it's split here to match single classes.
+    """
+    wanted = set(class_names)
+
+    def matches(class_attribute) -> bool:
+        if class_attribute is None:
+            return False
+        classes = class_attribute.split() if isinstance(class_attribute, str) else class_attribute
+        return not wanted.isdisjoint(classes)
+
+    return SoupStrainer(class_=matches)
+
+
+# Only the nodes each page type is read for get parsed, the rest of the document is skipped.
+DO512_LISTING = has_any_class("ds-listing", "ds-next-page")
+HEYAUSTIN_LISTING = has_any_class("fbe_col_title", "next")
+HEYAUSTIN_DETAILS = has_any_class("fbecol-8-12", "detail_items")
 
 
 class Event(NamedTuple):
@@ -28,67 +54,137 @@ class Event(NamedTuple):
     event_link: str | None
 
 
+class HostRateLimiter:
+    """Spaces out requests made to the same host, shared by every scraper thread."""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1 / requests_per_second if requests_per_second > 0 else 0
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, url: str):
+        """Block until a request to the host of this url is allowed."""
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+rate_limiter = HostRateLimiter(SCRAPER_REQUESTS_PER_SECOND)
+
+
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=0.5))
-def get_page(page: str):
+def fetch_page(page: str) -> FetchedPage:
+    """Gets raw html for url page provided, revalidated against the on-disk http cache."""
+    rate_limiter.wait(page)
+    return fetch(page, timeout=10)
+
+
+def parse_page(html: str, parse_only: SoupStrainer | None = None, parser: str = SCRAPER_PARSER) -> BeautifulSoup:
+    """
+    Parse html into a soup.
+    :param parse_only: restricts the tree to the nodes matched by this strainer.
+    :param parser: BeautifulSoup tree builder, lxml or html.parser.
+    """
+    return BeautifulSoup(html, features=parser, parse_only=parse_only)
+
+
+def get_page(page: str, parse_only: SoupStrainer | None = None):
     """Gets html data for url page provided."""
-    this_page = requests.get(page, headers=headers, timeout=10)
-    this_page.raise_for_status()
-    soup = BeautifulSoup(this_page.text, features="html.parser")
+    soup = parse_page(fetch_page(page).text, parse_only)
     return soup
 
 
-def gather_events_data_source_do512(url: str, events_list=None) -> list[Event]:
+def iter_pages(
+    url: str, find_next_url: Callable[[BeautifulSoup, str], str | None], parse_only: SoupStrainer | None = None
+) -> Iterator[tuple[str, BeautifulSoup]]:
     """
-    Gather important data from events in Do512 pages.
+    Yield the url and soup of every page of a listing, the next page is fetched while the current one is parsed.
+    :param url: url of the first page.
+    :param find_next_url: returns the url of the following page from a page soup and url, None on the last page.
+    :param parse_only: strainer applied to every page.
+    """
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        soup = get_page(url, parse_only)
+        while soup is not None:
+            next_url = find_next_url(soup, url)
+            upcoming = prefetcher.submit(get_page, next_url, parse_only) if next_url is not None else None
+            yield url, soup
+            url, soup = next_url, upcoming.result() if upcoming is not None else None
+    print("No next page")
+
+
+def do512_next_page(soup: BeautifulSoup, page_url: str = SOURCE_ONE) -> str | None:
+    next_page = soup.find("a", class_="ds-next-page")
+    return urljoin(page_url, next_page["href"]) if next_page is not None else None
+
+
+def iter_events_data_source_do512(url: str, tracker=None) -> Iterator[Event]:
+    """
+    Yield important data from events in Do512 pages, page by page.
     :param url: url of page being scraped.
-    :param events_list: ongoing list of events from this source
-    """
-    hot_soup = get_page(url)
-    events_soup = hot_soup.find_all("div", class_="ds-listing")
-    next_page = hot_soup.find("a", class_="ds-next-page")
-    if events_list is None:
-        events_list = []
-    events = events_list
-    for event in events_soup:
-        event_details_links = SOURCE_ONE + event["data-permalink"]
-        category_types = event["class"][2][9:]
-
-        title = event.find("span", class_="ds-listing-event-title-text").text.strip()
-        # Accounts for events that have TBD dates
-        if event.find("meta", itemprop="startDate") is None:
-            print(INCOMPLETE_INFO)
+    :param tracker: optional IncrementalScrape, skips pages that hold nothing new.
+    """
+    for page_url, hot_soup in iter_pages(url, do512_next_page, DO512_LISTING):
+        events_soup = hot_soup.find_all("div", class_="ds-listing")
+        page_events = []
+        for event in events_soup:
+            event_details_links = urljoin(page_url, event["data-permalink"])
+            category_types = event["class"][2][9:]
+
+            title = event.find("span", class_="ds-listing-event-title-text").text.strip()
+            # Accounts for events that have TBD dates
+            if event.find("meta", itemprop="startDate") is None:
+                print(INCOMPLETE_INFO)
+                continue
+            else:
+                event_date = event.find("meta", itemprop="startDate")["datetime"][:-5]
+
+            start_time = datetime.strptime(event_date, "%Y-%m-%dT%H:%M")
+            venue_details = event.find("div", class_="ds-venue-name")
+            venue_location = venue_details.find("span", itemprop="name").text.strip()
+            page_events.append(
+                Event(
+                    title,
+                    start_time,
+                    venue_location,
+                    category_types,
+                    event_details_links,
+                )
+            )
+        # The listing carries every field, fingerprinting the parsed events catches changed venues and categories.
+        if tracker is not None and tracker.page_unchanged(page_url, tracker.event_keys(page_events)):
+            print(f"{page_url} unchanged since the last run, skipping")
             continue
-        else:
-            event_date = event.find("meta", itemprop="startDate")["datetime"][:-5]
-
-        start_time = datetime.strptime(event_date, "%Y-%m-%dT%H:%M")
-        venue_details = event.find("div", class_="ds-venue-name")
-        venue_location = venue_details.find("span", itemprop="name").text.strip()
-        this_event = Event(
-            title,
-            start_time,
-            venue_location,
-            category_types,
-            event_details_links,
-        )
-
-        events.append(this_event)
-
-    if next_page is not None:
-        next_page_url = next_page["href"]
-        source = SOURCE_ONE + next_page_url
-        gather_events_data_source_do512(source, events)
-    else:
-        print("No next page")
-    return events
+        if tracker is not None and tracker.all_ingested(page_events):
+            print(f"Every event of {page_url} is already stored, skipping")
+            continue
+        yield from page_events
+
+
+def gather_events_data_source_do512(url: str) -> list[Event]:
+    """
+    Gather important data from events in Do512 pages.
+    :param url: url of page being scraped.
+    """
+    return list(iter_events_data_source_do512(url))
 
 
 def extract_details(details_url: str) -> Event:
     """
-    Extract all details from subpage.
-    :param events_soup.
+    Extract all details from subpage, unchanged subpages reuse the event parsed on the previous run.
+    :param details_url: url of the event subpage.
     """
-    hot_soup = get_page(details_url)
+    page = fetch_page(details_url)
+    if page.not_modified and (parsed := http_cache.load_parsed(details_url)) is not None:
+        return Event(**{**parsed, "start_datetime": datetime.fromisoformat(parsed["start_datetime"])})
+
+    hot_soup = parse_page(page.text, HEYAUSTIN_DETAILS)
     event_soup = hot_soup.find("div", class_="fbecol-8-12")
     title = event_soup.h1.text.strip()
     venue_details = hot_soup.find("div", class_="detail_items").find_all("div")[:4]
@@ -121,106 +217,155 @@ def extract_details(details_url: str) -> Event:
         None,
         event_link,
     )
+    if http_cache is not None:
+        http_cache.store_parsed(details_url, {**event._asdict(), "start_datetime": start_datetime.isoformat()})
     return event
 
 
-def gather_events_data_source_heyaustin(url: str, events_list=None) -> list[Event]:
+def heyaustin_next_page(soup: BeautifulSoup, page_url: str = SOURCE_TWO) -> str | None:
+    next_page = soup.find("a", class_="next page-numbers")
+    return urljoin(page_url, next_page["href"]) if next_page is not None else None
+
+
+def iter_events_data_source_heyaustin(
+    url: str, max_workers: int = SCRAPER_MAX_WORKERS, tracker=None
+) -> Iterator[Event]:
+    """
+    Yield important data from events in HeyAustin pages, page by page.
+    Detail pages of a listing page are fetched concurrently, results keep the listing order.
+    :param url: url of page being scraped.
+    :param max_workers: amount of detail pages fetched at the same time
+    :param tracker: optional IncrementalScrape, skips pages that hold nothing new.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for page_url, hot_soup in iter_pages(url, heyaustin_next_page, HEYAUSTIN_LISTING):
+            events_soup = hot_soup.find_all("div", class_="fbe_col_title")
+            details_links = [urljoin(page_url, event.a["href"]) for event in events_soup]
+            page_events = []
+            # Venues and categories are only on the detail pages, they are always revalidated.
+            # Unchanged ones answer 304 and reuse the event parsed on the previous run.
+            for event_details in executor.map(extract_details, details_links):
+                if event_details is not None:
+                    page_events.append(event_details)
+                else:
+                    print(INCOMPLETE_INFO)
+            if tracker is not None and tracker.page_unchanged(page_url, tracker.event_keys(page_events)):
+                print(f"{page_url} unchanged since the last run, skipping")
+                continue
+            if tracker is not None and tracker.all_ingested(page_events):
+                print(f"Every event of {page_url} is already stored, skipping")
+                continue
+            yield from page_events
+
+
+def gather_events_data_source_heyaustin(url: str, max_workers: int = SCRAPER_MAX_WORKERS) -> list[Event]:
     """
     Gather important data from events in HeyAustin pages.
     :param url: url of page being scraped.
-    :param events_list: ongoing list of events from this source
-    """
-    hot_soup = get_page(url)
-    next_page = hot_soup.find("a", class_="next page-numbers")
-    events_soup = hot_soup.find_all("div", class_="fbe_col_title")
-    if events_list is None:
-        events_list = []
-    events = events_list
-    for event in events_soup:
-        event_details = extract_details(event.a["href"])
-        if event_details is not None:
-            events.append(event_details)
-        else:
-            print(INCOMPLETE_INFO)
-
-    if next_page is not None:
-        next_page_url = next_page["href"]
-        source = next_page_url
-        gather_events_data_source_heyaustin(source, events)
-    else:
-        print("No next page")
-    return events
+    :param max_workers: amount of detail pages fetched at the same time
+    """
+    return list(iter_events_data_source_heyaustin(url, max_workers))
 
 
-def auto_scroll(page, max_scrolls=10):
+def auto_scroll(page, max_scrolls=10, timeout_ms=SCRAPER_SCROLL_TIMEOUT_MS):
     """
     Scrolls to load the entire page and its contents for webscrapping
-    :param page: url of the page being scraped
+    :param page: playwright page being scraped
     :max_scrolls: the amount of times to scroll down the page
+    :timeout_ms: how long to wait for new content after each scroll
     """
     # Scroll to the bottom of the page to trigger loading of all content
     previous_height = page.evaluate("document.body.scrollHeight")
 
-    scrolls = 0
-    while True:
+    for _ in range(max_scrolls):
         page.evaluate("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(1)  # Wait for the new content to load
-        scrolls += 1
-
-        # Check if more content has loaded by comparing the page height
-        new_height = page.evaluate("document.body.scrollHeight")
-        if new_height == previous_height:
-            break
-        previous_height = new_height
-
-        if scrolls >= max_scrolls:
+        # Resumes as soon as new content grows the page, instead of sleeping a fixed time
+        try:
+            page.wait_for_function(
+                "height => document.body.scrollHeight > height", arg=previous_height, timeout=timeout_ms
+            )
+        except PlaywrightTimeoutError:
             break
+        previous_height = page.evaluate("document.body.scrollHeight")
 
 
-def gather_events_data_atx_culture(url: str) -> list[Event]:
+def gather_events_data_atx_culture(url: str, pool: BrowserPool | None = None) -> list[Event]:
     """
     Gather important event data in Austin Culture map pages.
     :param url: url of page being scraped.
-    :param events_list: ongoing list of events from this source
+    :param pool: browser pool to reuse, a browser is started for this call when missing.
+    """
+    if pool is None:
+        with BrowserPool() as pool:
+            return gather_events_data_atx_culture(url, pool)
+
+    with pool.page() as page:
+        page.goto(url, wait_until="domcontentloaded")
+
+        # if we want to load more content, but as we run it daily this
+        # might not be needed
+        auto_scroll(page)
+
+        return parse_atx_culture_page(page)
+
+
+def gather_events_data_atx_culture_tags(urls: Iterable[str]) -> Iterator[Event]:
+    """
+    Gather important event data in several Austin Culture map pages, e.g. one per tag, with a single browser.
+    :param urls: urls of the pages being scraped.
+    """
+    with BrowserPool() as pool:
+        for url in urls:
+            yield from gather_events_data_atx_culture(url, pool)
+
+
+# Reads every date headline, grid link and event post of the page in the browser, returned in one round trip.
+CULTUREMAP_EVENTS_SCRIPT = """
+() => ({
+    dates: Array.from(document.querySelectorAll("div.module-headline__text"), (date) => date.innerText),
+    grids: Array.from(document.querySelectorAll("div.grid-flow-row-dense"), (grid) => ({
+        links: Array.from(grid.querySelectorAll("a"), (link) => link.getAttribute("href")),
+        posts: Array.from(grid.querySelectorAll("div.event-post"), (post) => post.innerText),
+    })),
+})
+"""
+
+
+def parse_atx_culture_page(page) -> list[Event]:
+    """
+    Read the events out of a loaded Austin Culture map page.
+    :param page: playwright page, or any object with the same methods.
+    """
+    page.wait_for_selector("div.module-headline__text", timeout=10000)
+    return parse_atx_culture_events(page.evaluate(CULTUREMAP_EVENTS_SCRIPT))
+
+
+def parse_atx_culture_events(payload: dict) -> list[Event]:
+    """
+    Build events from the dates and grids extracted by CULTUREMAP_EVENTS_SCRIPT.
+    :param payload: dates headlines and the grid of events under each of them.
     """
     events = []
-    with sync_playwright() as p:
-        with p.chromium.launch(headless=HEADLESS) as browser:
-            page = browser.new_page()
-            page.goto(url)
-
-            # if we want to load more content, but as we run it daily this
-            # might not be needed
-            auto_scroll(page)
-
-            page.wait_for_selector("div.module-headline__text", timeout=10000)
-
-            event_dates = page.query_selector_all("div.module-headline__text")
-            event_grids = page.query_selector_all("div.grid-flow-row-dense")
-
-            event_dates = [event.inner_text() for event in event_dates]
-
-            for date, grid in zip(event_dates, event_grids, strict=False):
-                for link in grid.query_selector_all("a"):
-                    if link.get_attribute("href") is not None:
-                        event_link = link.get_attribute("href")
-
-                date_only = date.splitlines()
-
-                for event in grid.query_selector_all("div.event-post"):
-                    event = event.inner_text()
-                    fields = event.splitlines()
-                    if len(fields) < 3:
-                        print("Missing event data: ", fields)
-                        continue
-                    if len(fields) == 4:  # get editor's pick off
-                        fields = fields[1:]
-
-                    title, venue, time = fields
-                    date_object = f"{date_only[1].strip()} {time}"
-                    start_time = datetime.strptime(date_object, "%B %d, %Y %I:%M %p")
-                    events.append(
-                        Event(title=title, start_datetime=start_time, venue=venue, category=None, event_link=event_link)
-                    )
+    for date, grid in zip(payload["dates"], payload["grids"], strict=False):
+        for link in grid["links"]:
+            if link is not None:
+                event_link = link
+
+        date_only = date.splitlines()
+
+        for event in grid["posts"]:
+            fields = event.splitlines()
+            if len(fields) < 3:
+                print("Missing event data: ", fields)
+                continue
+            if len(fields) == 4:  # get editor's pick off
+                fields = fields[1:]
+
+            title, venue, time = fields
+            date_object = f"{date_only[1].strip()} {time}"
+            start_time = datetime.strptime(date_object, "%B %d, %Y %I:%M %p")
+            events.append(
+                Event(title=title, start_datetime=start_time, venue=venue, category=None, event_link=event_link)
+            )
 
     return events
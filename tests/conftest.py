@@ -0,0 +1,34 @@
+import os
+import tempfile
+
+# The settings are read when src.constants is imported, point them to a throwaway database first.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("PREDICT_API", "http://localhost")
+os.environ.setdefault("EVENTS_HQ_TOKEN", "test-token")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel
+
+from src.api.main_api import app, events_cache
+from src.data.database import engine
+from src.data.db_helper import user_cache
+
+
+@pytest.fixture
+def client():
+    SQLModel.metadata.create_all(engine)
+    with TestClient(app) as test_client:
+        yield test_client
+    SQLModel.metadata.drop_all(engine)
+    events_cache.responses.clear()
+    user_cache.clear()
+
+
+@pytest.fixture
+def auth_headers(client):
+    user = {"user_name": "tester", "email": "tester@example.com", "password": "secret", "hashed_password": ""}
+    client.post("/users/", json=user).raise_for_status()
+    response = client.post("/token", data={"username": "tester", "password": "secret"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
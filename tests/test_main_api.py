@@ -0,0 +1,54 @@
+from sqlmodel import Session, select
+
+from src.api.main_api import events_cache
+from src.data.database import engine
+from src.data.db_models import UserEventsAttended, UserEventsSaved
+
+EVENT = {"title": "Band", "venue": "Stubb's", "start_datetime": "2030-01-01T20:00:00", "category": "music"}
+
+
+def link_rows(link_model) -> list:
+    with Session(engine) as session:
+        return session.exec(select(link_model)).all()
+
+
+def test_delete_saved_event_deletes_its_links(client, auth_headers):
+    event_id = client.post("/events/", json=EVENT).json()["id"]
+    client.post("/users/me/events/saved", json={"event_id": event_id}, headers=auth_headers).raise_for_status()
+
+    response = client.delete(f"/events/{event_id}")
+
+    assert response.status_code == 200
+    assert link_rows(UserEventsSaved) == []
+    assert client.get("/users/me/events/saved/ids", headers=auth_headers).json() == {"event_ids": []}
+
+
+def test_delete_user_deletes_their_links(client, auth_headers):
+    event_id = client.post("/events/", json=EVENT).json()["id"]
+    client.post("/users/me/events/saved", json={"event_id": event_id}, headers=auth_headers).raise_for_status()
+    user_id = client.get("/users/me/", headers=auth_headers).json()["id"]
+
+    response = client.delete(f"/users/{user_id}")
+
+    assert response.status_code == 200
+    assert link_rows(UserEventsSaved) == []
+    assert link_rows(UserEventsAttended) == []
+    assert client.get(f"/events/{event_id}").status_code == 200
+
+
+def test_unknown_params_share_cached_responses(client):
+    client.post("/events/", json=EVENT).raise_for_status()
+
+    for path in ("/events/", "/events/?x=1", "/events/?x=2", "/events/?include="):
+        assert client.get(path).status_code == 200
+    for from_date in ("2030-01-01", "2030-01-01T00:00:00"):
+        assert client.get(f"/search_events/?from_date={from_date}&nocache=1").json()["total_events"] == 1
+
+    assert len(events_cache.responses._entries) == 2
+
+
+def test_events_limit_is_bounded(client):
+    assert client.get("/events/?limit=-1").status_code == 422
+    assert client.get("/events/?limit=100000").status_code == 422
+    assert client.get("/events/?skip=-1").status_code == 422
+    assert client.get("/events/?limit=500").status_code == 200